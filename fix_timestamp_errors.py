@@ -5,29 +5,44 @@ Fix Timestamp Errors Script
 ---------------------------
 This script fixes timestamp field type errors in Firestore documents.
 It updates documents that have incorrect timestamp types to use SERVER_TIMESTAMP.
+
+The scan runs on a small maintenance engine that is reusable for other schema
+migrations: field-masked queries, parallel partitions, cursor pagination with a
+persisted resume state, BulkWriter for the fixes and a --dry-run report.
 """
 
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+import typer
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 FIREBASE_CREDENTIALS = os.environ["FIREBASE_CREDENTIALS"]
+MAINTENANCE_STATE_DIR = Path(os.getenv("MAINTENANCE_STATE_DIR", "./cache/maintenance"))
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s %(levelname)s | %(message)s")
 log = logging.getLogger(__name__)
 
+# List of problematic document IDs from error messages
+PROBLEM_DOCS = [
+    "l-wenkopf-in-mandala-d3390d",
+    "mandala-bl-tenmuster-543ecc"
+]
+
 def initialize_firebase():
     """Initialize Firebase connection."""
     try:
@@ -41,117 +56,294 @@ def initialize_firebase():
     except (json.JSONDecodeError, ValueError) as e:
         log.error("ERROR: FIREBASE_CREDENTIALS is invalid: %s", e)
         raise SystemExit("Firebase initialization failed.")
-    
+
     firebase_admin.initialize_app(cred)
     return firestore.client()
 
-def fix_timestamp_for_document(db: firestore.Client, doc_id: str) -> bool:
-    """Fix timestamp field for a specific document."""
-    try:
-        # Get reference to the document
-        doc_ref = db.collection("images").document(doc_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            log.warning("Document %s does not exist", doc_id)
+# ─────────────────────────── MIGRATIONS ───────────────────────────
+class Migration:
+    """
+    A schema migration over one collection. Only `fields` are fetched per
+    document; `check` returns (reason, update) for documents that need a fix.
+    """
+    name = ""
+    collection = "images"
+    fields: List[str] = []
+
+    def check(self, data: dict) -> Optional[Tuple[str, dict]]:
+        raise NotImplementedError
+
+class TimestampMigration(Migration):
+    """Replace non-Timestamp `timestamp` values with SERVER_TIMESTAMP."""
+    name = "timestamp"
+    fields = ["timestamp"]
+
+    def check(self, data: dict) -> Optional[Tuple[str, dict]]:
+        if "timestamp" not in data:
+            return None
+        # Correct Firestore timestamps are read back as DatetimeWithNanoseconds
+        timestamp_value = data["timestamp"]
+        if isinstance(timestamp_value, DatetimeWithNanoseconds):
+            return None
+        return type(timestamp_value).__name__, {"timestamp": firestore.SERVER_TIMESTAMP}
+
+MIGRATIONS: Dict[str, Migration] = {m.name: m for m in [TimestampMigration()]}
+
+# ─────────────────────── MAINTENANCE ENGINE ───────────────────────
+class MigrationState:
+    """
+    Persisted partition boundaries and per-partition cursors, so an aborted
+    run resumes where it stopped instead of rescanning from zero.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data: dict = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    @property
+    def partitions(self) -> List[dict]:
+        return self.data.get("partitions", [])
+
+    def init_partitions(self, bounds: List[Tuple[Optional[str], Optional[str]]]):
+        self.data = {"partitions": [{"start": s, "end": e, "last": None, "done": False} for s, e in bounds]}
+        self.save()
+
+    def advance(self, index: int, last: Optional[str], done: bool):
+        with self._lock:
+            part = self.data["partitions"][index]
+            part["last"] = last or part["last"]
+            part["done"] = done
+            self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def clear(self):
+        self.data = {}
+        self.path.unlink(missing_ok=True)
+
+class MaintenanceReport:
+    """Thread-safe counters plus the documents that need (or got) a fix and the writes that failed."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.scanned = 0
+        self.fixes: List[dict] = []
+        self.failed: List[dict] = []
+
+    def add(self, scanned: int, fixes: List[dict]):
+        with self._lock:
+            self.scanned += scanned
+            self.fixes.extend(fixes)
+
+    def add_failure(self, path: str, message: str):
+        with self._lock:
+            self.failed.append({"path": path, "error": message})
+
+    def failed_paths(self) -> set:
+        with self._lock:
+            return {f["path"] for f in self.failed}
+
+    def summary(self) -> Dict[str, int]:
+        by_reason: Dict[str, int] = {}
+        for fix in self.fixes:
+            by_reason[fix["reason"]] = by_reason.get(fix["reason"], 0) + 1
+        return by_reason
+
+def _partition_bounds(db: firestore.Client, collection: str, count: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Split the collection into ~count key ranges via a collection-group partition query."""
+    if count <= 1:
+        return [(None, None)]
+    bounds = []
+    for partition in db.collection_group(collection).get_partitions(count):
+        start = partition.start_at.path if partition.start_at is not None else None
+        end = partition.end_at.path if partition.end_at is not None else None
+        bounds.append((start, end))
+    return bounds or [(None, None)]
+
+def _scan_partition(db: firestore.Client, migration: Migration, state: MigrationState, index: int,
+                    report: MaintenanceReport, writer, page_size: int, dry_run: bool):
+    """Page through one key range with a field mask, queueing fixes on the BulkWriter."""
+    part = state.partitions[index]
+    doc_id = firestore.FieldPath.document_id()
+    base = db.collection_group(migration.collection).select(migration.fields)
+    if part["end"]:
+        base = base.where(doc_id, "<", db.document(part["end"]))
+    last = part["last"]
+    while True:
+        query = base
+        if last:
+            query = query.where(doc_id, ">", db.document(last))
+        elif part["start"]:
+            query = query.where(doc_id, ">=", db.document(part["start"]))
+        docs = list(query.order_by(doc_id).limit(page_size).stream())
+        # The collection group also matches subcollections of the same name; only migrate the root collection
+        roots = [doc for doc in docs if doc.reference.parent.parent is None]
+        fixes = []
+        for doc in roots:
+            result = migration.check(doc.to_dict() or {})
+            if result is None:
+                continue
+            reason, update = result
+            fixes.append({"path": doc.reference.path, "reason": reason})
+            if not dry_run:
+                writer.update(doc.reference, update)
+        if fixes and not dry_run:
+            # Persist the cursor only after the page's writes went out
+            writer.flush()
+        failed = {fix["path"] for fix in fixes} & report.failed_paths()
+        report.add(len(roots), [fix for fix in fixes if fix["path"] not in failed])
+        if failed:
+            # Keep the cursor before this page so a rerun retries it
+            log.error("%d writes failed in partition %d; stopping it here (rerun to retry).", len(failed), index)
+            return
+        last = docs[-1].reference.path if docs else last
+        done = len(docs) < page_size
+        if not dry_run:
+            state.advance(index, last, done)
+        if done:
+            return
+
+def run_migration(db: firestore.Client, migration: Migration, dry_run: bool = False,
+                  partitions: int = 8, page_size: int = 500, reset: bool = False) -> MaintenanceReport:
+    """Run a migration over its collection in parallel partitions; resumable unless dry_run."""
+    # Dry runs keep their own throwaway state so they never touch a real run's resume point
+    state = MigrationState(MAINTENANCE_STATE_DIR / f"{migration.name}{'.dry-run' if dry_run else ''}.json")
+    if reset or dry_run:
+        state.clear()
+    if not state.partitions:
+        state.init_partitions(_partition_bounds(db, migration.collection, partitions))
+    else:
+        log.info("Resuming migration '%s' from saved state (%d/%d partitions done).",
+                 migration.name, sum(p["done"] for p in state.partitions), len(state.partitions))
+
+    report = MaintenanceReport()
+    writer = None if dry_run else db.bulk_writer()
+    if writer is not None:
+        def _on_error(error, *_):
+            if error.attempts < 5:
+                return True
+            report.add_failure(error.operation.reference.path, error.message)
             return False
-        
-        # Update the timestamp field with SERVER_TIMESTAMP
-        doc_ref.update({
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
-        
-        log.info("Successfully updated timestamp for document: %s", doc_id)
-        return True
-        
-    except Exception as e:
-        log.error("Failed to update timestamp for document %s: %s", doc_id, e)
-        return False
+        writer.on_write_error(_on_error)
 
-def fix_all_timestamp_errors(db: firestore.Client, problem_docs: List[str]):
-    """Fix timestamp errors for all problematic documents."""
+    pending = [i for i, p in enumerate(state.partitions) if not p["done"]]
+    log.info("Scanning '%s' for migration '%s' in %d partitions (dry run: %s)...",
+             migration.collection, migration.name, len(pending), dry_run)
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        futures = [pool.submit(_scan_partition, db, migration, state, i, report, writer, page_size, dry_run)
+                   for i in pending]
+        for fut in futures:
+            fut.result()
+    if writer is not None:
+        writer.close()
+    if report.failed:
+        log.error("%d writes failed; progress is saved, rerun to retry them.", len(report.failed))
+    else:
+        state.clear()
+    return report
+
+# ──────────────────────── TIMESTAMP FIXES ────────────────────────
+def fix_all_timestamp_errors(db: firestore.Client, problem_docs: List[str], dry_run: bool = False):
+    """Fix timestamp errors for all problematic documents with one batched read and a BulkWriter."""
     log.info("Starting timestamp fix for %d documents...", len(problem_docs))
-    
-    success_count = 0
-    failed_count = 0
-    
-    for doc_id in problem_docs:
-        if fix_timestamp_for_document(db, doc_id):
-            success_count += 1
-        else:
-            failed_count += 1
-    
+
+    refs = [db.collection("images").document(doc_id) for doc_id in problem_docs]
+    existing = [snap for snap in db.get_all(refs, field_paths=["timestamp"]) if snap.exists]
+    failed_count = len(refs) - len(existing)
+    for doc_id in set(problem_docs) - {snap.id for snap in existing}:
+        log.warning("Document %s does not exist", doc_id)
+
+    if dry_run:
+        for snap in existing:
+            log.info("[dry run] Would update timestamp for document: %s", snap.id)
+        return len(existing), failed_count
+
+    writer = db.bulk_writer()
+    results = {"ok": 0, "error": 0}
+    writer.on_write_result(lambda *_: results.__setitem__("ok", results["ok"] + 1))
+    def _on_error(error, *_):
+        if error.attempts < 5:
+            return True
+        log.error("Failed to update timestamp for document %s: %s", error.operation.reference.id, error.message)
+        results["error"] += 1
+        return False
+    writer.on_write_error(_on_error)
+    for snap in existing:
+        writer.update(snap.reference, {"timestamp": firestore.SERVER_TIMESTAMP})
+    writer.close()
+
+    success_count, failed_count = results["ok"], failed_count + results["error"]
     log.info("Timestamp fix completed. Success: %d, Failed: %d", success_count, failed_count)
     return success_count, failed_count
 
-def scan_and_fix_all_documents(db: firestore.Client):
+def scan_and_fix_all_documents(db: firestore.Client, dry_run: bool = False, partitions: int = 8,
+                               page_size: int = 500, reset: bool = False):
     """Scan all documents in images collection and fix timestamp issues."""
     log.info("Scanning all documents in images collection for timestamp issues...")
-    
+
     try:
-        from google.cloud.firestore_v1 import SERVER_TIMESTAMP
-        from datetime import datetime
-        
-        # Get all documents from images collection
-        docs = db.collection("images").stream()
-        
-        fixed_count = 0
-        total_count = 0
-        
-        for doc in docs:
-            total_count += 1
-            doc_data = doc.to_dict()
-            
-            # Check if timestamp field exists and has wrong type
-            if "timestamp" in doc_data:
-                timestamp_value = doc_data["timestamp"]
-                
-                # Check if timestamp is string, datetime, or other wrong type
-                # Correct Firestore timestamps are stored as google.cloud.firestore_v1._helpers.DatetimeWithNanoseconds
-                if isinstance(timestamp_value, (str, int, float, datetime)) or timestamp_value is None:
-                    log.info("Fixing timestamp for document %s (current type: %s)", 
-                            doc.id, type(timestamp_value).__name__)
-                    
-                    # Update with correct timestamp
-                    doc.reference.update({
-                        "timestamp": firestore.SERVER_TIMESTAMP
-                    })
-                    fixed_count += 1
-                else:
-                    # Log the type for debugging
-                    log.debug("Document %s has timestamp type: %s", doc.id, type(timestamp_value).__name__)
-        
-        log.info("Scanned %d documents, fixed %d timestamp issues", total_count, fixed_count)
-        return fixed_count, total_count
-        
+        report = run_migration(db, MIGRATIONS["timestamp"], dry_run=dry_run, partitions=partitions,
+                               page_size=page_size, reset=reset)
     except Exception as e:
-        log.error("Error scanning documents: %s", e)
-        return 0, 0
+        log.error("Error scanning documents (progress is saved, rerun to resume): %s", e)
+        return 0, 0, None
+
+    log.info("Scanned %d documents, %s %d timestamp issues %s", report.scanned,
+             "found" if dry_run else "fixed", len(report.fixes), report.summary())
+    for failure in report.failed:
+        log.error("Failed to update %s: %s", failure["path"], failure["error"])
+    return len(report.fixes), report.scanned, report
+
+app = typer.Typer(add_completion=False)
 
-def main():
+@app.command()
+def main(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only report documents that would be fixed."),
+    migration: str = typer.Option("timestamp", help="Migration to run: " + ", ".join(MIGRATIONS)),
+    doc: List[str] = typer.Option(PROBLEM_DOCS, "--doc", help="Document IDs to fix directly before the scan."),
+    partitions: int = typer.Option(8, help="Number of parallel partitions for the scan."),
+    page_size: int = typer.Option(500, help="Documents per page and partition."),
+    reset: bool = typer.Option(False, "--reset", help="Discard saved progress and start from zero."),
+    report: Optional[Path] = typer.Option(None, help="Write the list of affected documents as JSON."),
+):
     """Main function to fix timestamp errors."""
     log.info("Starting timestamp error fix script...")
-    
+    if migration not in MIGRATIONS:
+        raise typer.BadParameter(f"Unknown migration '{migration}'", param_hint="--migration")
+
     # Initialize Firebase
     db = initialize_firebase()
-    
-    # List of problematic document IDs from error messages
-    problem_docs = [
-        "l-wenkopf-in-mandala-d3390d",
-        "mandala-bl-tenmuster-543ecc"
-    ]
-    
-    # Fix specific documents mentioned in error
-    log.info("Fixing specific documents mentioned in error...")
-    success_count, failed_count = fix_all_timestamp_errors(db, problem_docs)
-    
+
+    success_count = failed_count = 0
+    if migration == "timestamp" and doc:
+        # Fix specific documents mentioned in error
+        log.info("Fixing specific documents mentioned in error...")
+        success_count, failed_count = fix_all_timestamp_errors(db, doc, dry_run=dry_run)
+
     # Scan and fix all documents (optional comprehensive fix)
     log.info("Performing comprehensive scan and fix...")
-    scan_fixed, scan_total = scan_and_fix_all_documents(db)
-    
+    if migration == "timestamp":
+        scan_fixed, scan_total, scan_report = scan_and_fix_all_documents(
+            db, dry_run=dry_run, partitions=partitions, page_size=page_size, reset=reset)
+    else:
+        scan_report = run_migration(db, MIGRATIONS[migration], dry_run=dry_run, partitions=partitions,
+                                    page_size=page_size, reset=reset)
+        scan_fixed, scan_total = len(scan_report.fixes), scan_report.scanned
+
+    if report is not None and scan_report is not None:
+        report.write_text(json.dumps({"migration": migration, "dryRun": dry_run, "scanned": scan_total,
+                                      "byReason": scan_report.summary(), "documents": scan_report.fixes,
+                                      "failed": scan_report.failed},
+                                     indent=2), encoding="utf-8")
+        log.info("Report written to %s", report)
+
     log.info("Fix script completed.")
     log.info("Specific documents - Success: %d, Failed: %d", success_count, failed_count)
-    log.info("Comprehensive scan - Fixed: %d out of %d total documents", scan_fixed, scan_total)
+    log.info("Comprehensive scan - %s: %d out of %d total documents",
+             "Would fix" if dry_run else "Fixed", scan_fixed, scan_total)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    app()
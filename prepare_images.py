@@ -4,7 +4,7 @@ Printable Content-Pipeline (KORRIGIERT)
 ---------------------------------------
 • Wandelt PNG-Ausmalbilder in **echte SVG-Vektoren** über *potrace*
 • Erzeugt A4-SVGs mit Rand (Verhältnis 210:297) inklusive Style-Block
-• Erzeugt A4-Thumbnails (Breite fest, Höhe A4-Verhältnis)
+• Erzeugt A4-Thumbnails (Breite fest, Höhe A4-Verhältnis) plus Varianten in mehreren Breiten/Formaten
 • Prüft automatisch die Qualität von SVG und Thumbnail
 • Analysiert Motive & Tags mit **Gemini Flash 1.5**
 • Übersetzt Titel + Tags in 20 Sprachen (Cache in SQLite)
@@ -12,24 +12,31 @@ Printable Content-Pipeline (KORRIGIERT)
 • KORRIGIERT: Kompatibel mit Flutter-App Datenstruktur
 """
 from __future__ import annotations
-import os, re, json, time, uuid, hashlib, tempfile, logging, threading, subprocess
+import os, io, re, json, time, uuid, base64, random, hashlib, tempfile, logging, threading, subprocess, unicodedata
+import functools, contextlib, heapq, cProfile, tracemalloc, atexit, queue, gzip
+import logging.handlers
 import xml.etree.ElementTree as ET
 import datetime as dt
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, NamedTuple
 import http.client
 import socket
 import urllib3.exceptions
+import requests.adapters
+import requests.exceptions
 from dotenv import load_dotenv
-from PIL import Image, ImageOps
+from PIL import Image, ImageChops, ImageOps, ImageStat
 import google.generativeai as genai
 from google.api_core import exceptions as google_api_exceptions
+import typer
 import firebase_admin
 from firebase_admin import credentials, firestore, storage
 import sqlite3
 # ───────────────────────── CONFIG ──────────────────────────
 load_dotenv()
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
 GEMINI_API_KEY        = os.environ["GEMINI_API_KEY"]
 FIREBASE_CREDENTIALS  = os.environ["FIREBASE_CREDENTIALS"]
 FIREBASE_BUCKET       = os.environ["FIREBASE_BUCKET"]
@@ -40,9 +47,43 @@ MAX_PARALLEL          = int(os.getenv("MAX_PARALLEL", "1"))
 TARGET_THUMB_WIDTH_PX = int(os.getenv("THUMB_WIDTH", "350"))
 TRACE_THRESHOLD       = os.getenv("TRACE_THRESHOLD", "0.5")
 THUMB_RATIO_TOLERANCE = float(os.getenv("THUMB_RATIO_TOLERANCE", "0.05"))
+# Thumbnail-Varianten: ein Render, mehrere Breiten/Formate (webp, avif, png)
+THUMB_WIDTHS          = sorted({int(w) for w in os.getenv(
+    "THUMB_WIDTHS", f"{TARGET_THUMB_WIDTH_PX // 2},{TARGET_THUMB_WIDTH_PX},{TARGET_THUMB_WIDTH_PX * 2}"
+).split(",") if w.strip()})
+THUMB_FORMATS         = [f.strip().lower() for f in os.getenv("THUMB_FORMATS", "webp,png").split(",") if f.strip()]
+THUMB_WEBP_QUALITY    = int(os.getenv("THUMB_WEBP_QUALITY", "80"))
+THUMB_AVIF_QUALITY    = int(os.getenv("THUMB_AVIF_QUALITY", "60"))
+THUMB_PALETTE_COLORS  = int(os.getenv("THUMB_PALETTE_COLORS", "16"))  # 2 = 1-Bit-PNG
+# "inkscape" rendert das A4-SVG, "bitmap" setzt die vorverarbeitete Bitmap direkt mit Pillow (ohne Inkscape)
+THUMB_ENGINE          = os.getenv("THUMB_ENGINE", "inkscape").strip().lower()
+THUMB_ENGINE_MAX_DIFF = float(os.getenv("THUMB_ENGINE_MAX_DIFF", "4"))  # mittlere Grauwert-Abweichung (0-255)
+GEMINI_RPM            = int(os.getenv("GEMINI_RPM", "60"))
+# Retry-Engine: Jitter-Grenzen, prozessweites Retry-Budget, Circuit Breaker pro Endpunkt
+RETRY_BASE_DELAY      = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY       = float(os.getenv("RETRY_MAX_DELAY", "60"))
+RETRY_BUDGET_TOKENS   = float(os.getenv("RETRY_BUDGET_TOKENS", "100"))
+RETRY_BUDGET_RATIO    = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_COOLDOWN_SECONDS  = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+# Storage: inhaltsbasierte Blob-Namen, Skip bei identischem Blob, Cache-Header
+CONTENT_ADDRESSED_BLOBS = _env_flag("CONTENT_ADDRESSED_BLOBS")
+# Existenz-/MD5-Prüfung lohnt nur, wenn ein Name schon existieren kann (inhaltsbasiert statt uuid)
+UPLOAD_SKIP_EXISTING  = _env_flag("UPLOAD_SKIP_EXISTING", "1" if CONTENT_ADDRESSED_BLOBS else "0")
+UPLOAD_CACHE_CONTROL  = os.getenv("UPLOAD_CACHE_CONTROL", "public, max-age=31536000, immutable")
+# Upload-Pool: eigene Threads + gemeinsamer HTTP-Connection-Pool, Chunked Upload für große SVGs
+UPLOAD_PARALLEL       = int(os.getenv("UPLOAD_PARALLEL", "8"))
+UPLOAD_RESUMABLE_THRESHOLD = int(os.getenv("UPLOAD_RESUMABLE_THRESHOLD", str(8 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE     = int(os.getenv("UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))  # Vielfaches von 256 KiB
+# Bilder, deren Uploads/Commit noch laufen, während die Worker schon weiterarbeiten (begrenzt den Speicher)
+UPLOAD_MAX_PENDING_IMAGES = int(os.getenv("UPLOAD_MAX_PENDING_IMAGES", "8"))
 
 A4_WIDTH_MM, A4_HEIGHT_MM = 210, 297
 
+# Format → {Breite → kodierte Bytes}
+ThumbVariants = Dict[str, Dict[int, bytes]]
+THUMB_MIME: Dict[str, str] = {"webp": "image/webp", "avif": "image/avif", "png": "image/png"}
+
 # ERWEITERTE SPRACH-MAP MIT 100 SPRACHEN (basierend auf den meist gesprochenen Sprachen der Welt)
 LANG_MAP: Dict[str, str] = {
     "Deutsch": "de",
@@ -164,15 +205,252 @@ LANG_MAP: Dict[str, str] = {
     "Tibetisch": "bo"
 }
 
+# Auswahl der wichtigsten Sprachen für Hauptkategorien
+CATEGORY_PRIORITY_LANGUAGES: Dict[str, str] = {
+    "Englisch": "en",
+    "Spanisch": "es", 
+    "Französisch": "fr",
+    "Italienisch": "it",
+    "Portugiesisch": "pt",
+    "Niederländisch": "nl",
+    "Japanisch": "ja",
+    "Koreanisch": "ko",
+    "Mandarin": "zh",
+    "Russisch": "ru",
+    "Arabisch": "ar",
+    "Hindi": "hi",
+    "Türkisch": "tr"
+}
+
 # KORRIGIERT: Flexible Pfade
 BASE_IMAGE_DIRECTORY = Path(os.getenv("BASE_IMAGE_DIRECTORY", "./images"))
 CACHE_DIRECTORY = Path(os.getenv("CACHE_DIRECTORY", "./cache"))
+# Work-Queue-Modus für mehrere Hosts an einem Inbox-Verzeichnis ("" = aus, "sqlite", "firestore")
+QUEUE_BACKEND         = os.getenv("QUEUE_BACKEND", "").strip().lower()
+QUEUE_SQLITE_PATH     = Path(os.getenv("QUEUE_SQLITE_PATH", str(CACHE_DIRECTORY / "work_queue.db")))
+QUEUE_COLLECTION      = os.getenv("QUEUE_COLLECTION", "work_queue")
+QUEUE_LEASE_SECONDS   = float(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS    = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_DELAY     = float(os.getenv("QUEUE_RETRY_DELAY", "30"))
+QUEUE_CLAIM_BATCH     = int(os.getenv("QUEUE_CLAIM_BATCH", "20"))
+# Maximale Wartezeit eines untätigen Workers – offene Leases werden per Heartbeat laufend verlängert
+QUEUE_IDLE_POLL_SECONDS = float(os.getenv("QUEUE_IDLE_POLL_SECONDS", "5"))
+WORKER_ID             = os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+# Tag-Suche: Tags pro Sprache im Feld tags_<sprache> am Bild. Solange das kombinierte tags-Feld
+# zusätzlich geschrieben wird, trägt jedes Bild beide (Lesen ohne Feldmaske wird größer) –
+# nach Umstellung der App auf tags_<sprache> mit STORE_COMBINED_TAGS=0 abschalten
+STORE_COMBINED_TAGS   = _env_flag("STORE_COMBINED_TAGS", "1")
+# Felder, die die App für ein Suchergebnis braucht (Feldmaske der Suche)
+TAG_SEARCH_FIELDS     = ["id", "titles", "thumbnailPath", "thumbnailVariants", "svgPath", "categoryId", "ageGroup"]
+# Publish-First: Bild mit deutschen Metadaten sofort veröffentlichen, fehlende Sprachen per Backfill
+PUBLISH_FIRST         = _env_flag("PUBLISH_FIRST")
+TRANSLATION_BACKLOG_COLLECTION = os.getenv("TRANSLATION_BACKLOG_COLLECTION", "translation_backlog")
+BACKFILL_BATCH_LANGS  = int(os.getenv("BACKFILL_BATCH_LANGS", "20"))   # Sprachen pro update()
+BACKFILL_PAGE_SIZE    = int(os.getenv("BACKFILL_PAGE_SIZE", "50"))     # Backlog-Einträge pro Durchgang
+BACKFILL_RESERVE_RPM  = int(os.getenv("BACKFILL_RESERVE_RPM", "10"))   # Slots/min, die der Vordergrund behält
+BACKFILL_IDLE_SECONDS = float(os.getenv("BACKFILL_IDLE_SECONDS", "30"))
+# Run-Planer: Erfahrungswerte für die Schätzung (bei Bedarf aus processing.log nachjustieren)
+PLAN_HASH_WORKERS     = int(os.getenv("PLAN_HASH_WORKERS", "16"))
+PLAN_CPU_SECONDS_PER_IMAGE = float(os.getenv("PLAN_CPU_SECONDS_PER_IMAGE", "3"))
+PLAN_CPU_SECONDS_PER_MPX   = float(os.getenv("PLAN_CPU_SECONDS_PER_MPX", "1.5"))
+PLAN_SVG_BYTES_PER_PNG_BYTE = float(os.getenv("PLAN_SVG_BYTES_PER_PNG_BYTE", "0.8"))
+PLAN_THUMB_BYTES      = int(os.getenv("PLAN_THUMB_BYTES", "30000"))
+PLAN_UPLOAD_BYTES_PER_SECOND = float(os.getenv("PLAN_UPLOAD_BYTES_PER_SECOND", str(5e6)))
+# Kachel-Vektorisierung für sehr große Vorlagen (potrace ist single-threaded)
+TILE_TRACE_MIN_PIXELS = int(float(os.getenv("TILE_TRACE_MIN_PIXELS", "16e6")))
+TILE_SIZE             = int(os.getenv("TILE_SIZE", "2048"))
+TILE_OVERLAP          = int(os.getenv("TILE_OVERLAP", "64"))
+TILE_SEAM_PX          = float(os.getenv("TILE_SEAM_PX", "0.5"))
+TILE_WORKERS          = int(os.getenv("TILE_WORKERS", str(os.cpu_count() or 4)))
+# Profiling (opt-in): Spans pro Stufe als Chrome/Perfetto-Trace, cProfile der langsamsten Bilder
+PROFILE               = _env_flag("PROFILE")
+PROFILE_DIR           = Path(os.getenv("PROFILE_DIR", "./profiles"))
+PROFILE_SLOWEST_N     = int(os.getenv("PROFILE_SLOWEST_N", "5"))
+PROFILE_MEMORY        = _env_flag("PROFILE_MEMORY", "1")
+# Re-Render des Katalogs aus den gespeicherten SVGs (ohne Gemini)
+RERENDER_PAGE_SIZE    = int(os.getenv("RERENDER_PAGE_SIZE", "200"))
+RERENDER_WORKERS      = int(os.getenv("RERENDER_WORKERS", str(os.cpu_count() or 4)))
+RERENDER_DOWNLOAD_PARALLEL = int(os.getenv("RERENDER_DOWNLOAD_PARALLEL", "16"))
+RERENDER_STATE_PATH   = Path(os.getenv("RERENDER_STATE_PATH", str(CACHE_DIRECTORY / "rerender_state.json")))
+# Logging: JSON-Lines-Datei mit Rotation, Level je Stufe (z. B. "trace=WARNING,upload=DEBUG"), Sampling
+LOG_FILE              = Path(os.getenv("LOG_FILE", "processing.log"))
+LOG_LEVEL             = os.getenv("LOG_LEVEL", "INFO")
+LOG_STAGE_LEVELS      = os.getenv("LOG_STAGE_LEVELS", "")
+LOG_MAX_BYTES         = int(float(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024))))
+LOG_BACKUP_COUNT      = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_SAMPLE_ABOVE_IPM  = int(os.getenv("LOG_SAMPLE_ABOVE_IPM", "120"))  # Bilder/min; 0 = nie samplen
+LOG_SAMPLE_EVERY      = int(os.getenv("LOG_SAMPLE_EVERY", "10"))
+# Übersetzungs-Cache-Snapshot im Bucket, um neue Hosts/Runner warm zu starten
+TRANSLATION_SNAPSHOT_BLOB = os.getenv("TRANSLATION_SNAPSHOT_BLOB", "cache/translation_cache.jsonl.gz")
+TRANSLATION_SNAPSHOT_PULL = _env_flag("TRANSLATION_SNAPSHOT_PULL")
 # ──────────────────────── LOGGING ──────────────────────────
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s %(levelname)s | %(message)s",
-                    handlers=[logging.FileHandler("processing.log", encoding="utf-8"),
-                              logging.StreamHandler()])
+# Worker schreiben nur in eine Queue; ein QueueListener-Thread formatiert und
+# schreibt (JSON-Lines mit Rotation in LOG_FILE, Klartext auf die Konsole).
+_log_ctx = threading.local()  # image, hash, stage, verbose des aktuellen Worker-Threads
+
+def _parse_stage_levels(spec: str) -> Dict[str, int]:
+    levels: Dict[str, int] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        stage, _, level = part.partition("=")
+        levelno = logging.getLevelName(level.strip().upper())
+        if not isinstance(levelno, int):
+            raise SystemExit(f"Unbekanntes Log-Level in LOG_STAGE_LEVELS: {part}")
+        levels[stage.strip()] = levelno
+    return levels
+
+_LOG_LEVEL = logging.getLevelName(LOG_LEVEL.upper())
+_STAGE_LEVELS = _parse_stage_levels(LOG_STAGE_LEVELS)
+
+class LogSampler:
+    """
+    Ab LOG_SAMPLE_ABOVE_IPM fertigen Bildern pro Minute wird das INFO-Geplauder
+    nur noch für jedes LOG_SAMPLE_EVERY-te Bild geschrieben. Warnungen, Fehler
+    und Events mit extra={"always": True} gehen immer durch.
+    """
+    def __init__(self, above_ipm: int, every: int):
+        self.above_ipm, self.every = above_ipm, max(1, every)
+        self._lock = threading.Lock()
+        self._done: List[float] = []
+        self._started = 0
+        self.dropped = 0
+    def image_done(self):
+        now = time.monotonic()
+        with self._lock:
+            self._done.append(now)
+            while self._done and self._done[0] < now - 60:
+                self._done.pop(0)
+    def keep_image(self) -> bool:
+        """Entscheidet beim Start eines Bilds, ob seine INFO-Events geschrieben werden."""
+        with self._lock:
+            self._started += 1
+            if not self.above_ipm or len(self._done) <= self.above_ipm:
+                return True
+            return self._started % self.every == 0
+    def note_dropped(self):
+        with self._lock:
+            self.dropped += 1
+
+log_sampler = LogSampler(LOG_SAMPLE_ABOVE_IPM, LOG_SAMPLE_EVERY)
+
+class _ContextFilter(logging.Filter):
+    """Läuft im Worker-Thread: hängt Bild/Hash/Stufe an und wendet Stufen-Level und Sampling an."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.image = getattr(_log_ctx, "image", None)
+        record.hash = getattr(_log_ctx, "hash", None)
+        record.stage = getattr(_log_ctx, "stage", None)
+        if record.levelno < _STAGE_LEVELS.get(record.stage, _LOG_LEVEL):
+            return False
+        if (record.levelno <= logging.INFO and not getattr(_log_ctx, "verbose", True)
+                and not getattr(record, "always", False)):
+            log_sampler.note_dropped()
+            return False
+        return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """Ein JSON-Objekt pro Zeile; leere Kontextfelder werden weggelassen."""
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "image": getattr(record, "image", None),
+            "hash": getattr(record, "hash", None),
+            "stage": getattr(record, "stage", None),
+            "duration_ms": getattr(record, "duration_ms", None),
+            "msg": record.getMessage(),
+        }
+        return json.dumps({k: v for k, v in event.items() if v is not None}, ensure_ascii=False)
+
+def _log_handlers(log_file: Path) -> List[logging.Handler]:
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JsonLinesFormatter())
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s | %(message)s"))
+    return [file_handler, console]
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.addFilter(_ContextFilter())
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # Listener-Handler formatieren selbst
+logging.basicConfig(level=min([_LOG_LEVEL, *_STAGE_LEVELS.values()]), handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers(LOG_FILE), respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Queue beim Beenden noch leeren
 log = logging.getLogger(__name__)
+
+def bind_log_context(func):
+    """Überträgt den Log-Kontext des Aufrufers in einen Pool-Thread (z. B. Uploads)."""
+    ctx = dict(_log_ctx.__dict__)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        saved = dict(_log_ctx.__dict__)
+        _log_ctx.__dict__.update(ctx)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _log_ctx.__dict__.clear()
+            _log_ctx.__dict__.update(saved)
+    return wrapper
+
+def benchmark_logging(workers: int = 16, events: int = 5000) -> None:
+    """
+    Vergleicht Log-Durchsatz und Aufruf-Latenz aus Sicht der Worker: direkte
+    Handler (bisheriges Verhalten) gegen QueueHandler/QueueListener. Beide
+    schreiben JSON-Lines in eine Temp-Datei, die Konsole bleibt außen vor.
+    """
+    def _run(name: str, handler: logging.Handler) -> Tuple[float, float]:
+        bench = logging.getLogger(f"bench.{name}")
+        bench.propagate = False
+        bench.setLevel(logging.INFO)
+        bench.handlers = [handler]
+        latencies: List[List[float]] = [[] for _ in range(workers)]
+        barrier = threading.Barrier(workers + 1)
+        def _worker(idx: int):
+            _log_ctx.image, _log_ctx.hash, _log_ctx.stage = f"bench-{idx}.png", f"{idx:064x}", "bench"
+            barrier.wait()
+            own = latencies[idx]
+            for i in range(events):
+                t = time.perf_counter()
+                bench.info("Event %d von Worker %d", i, idx)
+                own.append(time.perf_counter() - t)
+        threads = [threading.Thread(target=_worker, args=(i,), name=f"bench-{i}") for i in range(workers)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        flat = sorted(l for own in latencies for l in own)
+        return elapsed, flat[int(len(flat) * 0.99)]
+
+    total = workers * events
+    with tempfile.TemporaryDirectory() as tmp:
+        direct = logging.handlers.RotatingFileHandler(Path(tmp) / "direct.log", maxBytes=LOG_MAX_BYTES,
+                                                      backupCount=1, encoding="utf-8")
+        direct.setFormatter(JsonLinesFormatter())
+        direct.addFilter(_ContextFilter())
+        sync_s, sync_p99 = _run("direct", direct)
+        direct.close()
+
+        bench_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queued = logging.handlers.QueueHandler(bench_queue)
+        queued.addFilter(_ContextFilter())
+        sink = logging.handlers.RotatingFileHandler(Path(tmp) / "queued.log", maxBytes=LOG_MAX_BYTES,
+                                                    backupCount=1, encoding="utf-8")
+        sink.setFormatter(JsonLinesFormatter())
+        listener = logging.handlers.QueueListener(bench_queue, sink)
+        listener.start()
+        async_s, async_p99 = _run("queued", queued)
+        drain_started = time.perf_counter()
+        listener.stop()
+        drain_s = time.perf_counter() - drain_started
+        sink.close()
+    log.info("Log-Benchmark (%d Worker × %d Events):", workers, events)
+    log.info("  direkt:     %8.0f Events/s, p99 %.1f µs pro Aufruf", total / sync_s, sync_p99 * 1e6)
+    log.info("  Queue:      %8.0f Events/s, p99 %.1f µs pro Aufruf (Listener braucht danach noch %.2fs)",
+             total / async_s, async_p99 * 1e6, drain_s)
 # ─────────────── FIREBASE / GEMINI INITIALISIERUNG ─────────
 _db: firestore.Client | None = None
 _bucket: storage.Bucket | None = None
@@ -196,6 +474,9 @@ def _initialize_services() -> None:
     firebase_admin.initialize_app(cred, {"storageBucket": FIREBASE_BUCKET})
     _db = firestore.client()
     _bucket = storage.bucket()
+    # Gemeinsame Session des Storage-Clients: Pool groß genug für alle Upload-Threads
+    adapter = requests.adapters.HTTPAdapter(pool_connections=UPLOAD_PARALLEL, pool_maxsize=UPLOAD_PARALLEL)
+    _bucket.client._http.mount("https://", adapter)
     genai.configure(api_key=GEMINI_API_KEY)
     MODEL_IMAGE = genai.GenerativeModel("gemini-1.5-flash")
     MODEL_TRANS = genai.GenerativeModel("gemini-1.5-flash")
@@ -214,13 +495,56 @@ class RateLimiter:
                 log.warning("Rate-Limit erreicht – warte %.1fs", sleep_duration)
                 time.sleep(sleep_duration)
             self._times.append(dt.datetime.now())
-rate = RateLimiter()
+    def headroom(self) -> int:
+        """Freie Slots im aktuellen 60s-Fenster."""
+        with self._lock:
+            now = dt.datetime.now()
+            return self.rpm - sum(1 for t in self._times if (now - t).seconds < 60)
+rate = RateLimiter(GEMINI_RPM)
+class UploadStats:
+    """Zählt hochgeladene und übersprungene (bereits vorhandene) Blobs und misst den Durchsatz."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files = {"uploaded": 0, "skipped": 0}
+        self.bytes = {"uploaded": 0, "skipped": 0}
+        self._busy_seconds = 0.0
+        self._first_start: float | None = None
+        self._last_end = 0.0
+    def add(self, kind: str, nbytes: int, started: float | None = None):
+        with self._lock:
+            self.files[kind] += 1
+            self.bytes[kind] += nbytes
+            if kind == "uploaded" and started is not None:
+                now = time.monotonic()
+                self._busy_seconds += now - started
+                self._first_start = started if self._first_start is None else min(self._first_start, started)
+                self._last_end = max(self._last_end, now)
+    def throughput(self) -> float:
+        """Gesendete Bytes pro Sekunde über das Zeitfenster aller Uploads (parallel überlappend)."""
+        with self._lock:
+            window = self._last_end - (self._first_start or self._last_end)
+            return self.bytes["uploaded"] / window if window > 0 else 0.0
+    def report(self) -> str:
+        rate_bps = self.throughput()
+        with self._lock:
+            return ("%d Dateien hochgeladen (%.1f MB, %.2f MB/s, %.1fs Upload-Zeit), "
+                    "%d übersprungen – %.1f MB nicht erneut gesendet"
+                    % (self.files["uploaded"], self.bytes["uploaded"] / 1e6, rate_bps / 1e6,
+                       self._busy_seconds, self.files["skipped"], self.bytes["skipped"] / 1e6))
+upload_stats = UploadStats()
 class TranslationCache:
+    SNAPSHOT_FORMAT = "translation-cache"
+    SNAPSHOT_VERSION = 1
     def __init__(self, path: str = "translation_cache.db"):
         self.conn = sqlite3.connect(path, check_same_thread=False)
         self.conn.execute("""CREATE TABLE IF NOT EXISTS tcache (
                                 orig TEXT, lang TEXT, trans TEXT,
                                 PRIMARY KEY(orig, lang))""")
+        # Migration: Zeitstempel für die Konfliktauflösung beim Snapshot-Import (Altbestand = 0)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tcache)")}
+        if "updated" not in columns:
+            self.conn.execute("ALTER TABLE tcache ADD COLUMN updated REAL NOT NULL DEFAULT 0")
+            self.conn.commit()
         self.lock = threading.Lock()
     def get(self, text: str, lang: str):
         with self.lock:
@@ -229,37 +553,375 @@ class TranslationCache:
             return row[0] if row else None
     def set(self, text: str, lang: str, trans: str):
         with self.lock:
-            self.conn.execute("INSERT OR REPLACE INTO tcache VALUES (?,?,?)", (text, lang, trans))
+            self.conn.execute("INSERT OR REPLACE INTO tcache (orig, lang, trans, updated) VALUES (?,?,?,?)",
+                              (text, lang, trans, time.time()))
             self.conn.commit()
+    def export_snapshot(self, out) -> int:
+        """
+        Schreibt den Cache als gzip-komprimierte JSON-Lines in das Binär-File out:
+        eine Kopfzeile mit Format/Version, danach pro Original eine Zeile
+        [orig, [[lang, trans, updated], ...]]. Gibt die Anzahl der Einträge zurück.
+        """
+        count = 0
+        with self.lock, gzip.open(out, "wt", encoding="utf-8") as snap:
+            total = self.conn.execute("SELECT COUNT(*) FROM tcache").fetchone()[0]
+            snap.write(json.dumps({"format": self.SNAPSHOT_FORMAT, "version": self.SNAPSHOT_VERSION,
+                                   "created": time.time(), "entries": total}) + "\n")
+            rows = self.conn.execute("SELECT orig, lang, trans, updated FROM tcache ORDER BY orig")
+            current, langs = None, []
+            for orig, lang, trans, updated in rows:
+                if orig != current and langs:
+                    snap.write(json.dumps([current, langs], ensure_ascii=False, separators=(",", ":")) + "\n")
+                    langs = []
+                current = orig
+                langs.append([lang, trans, updated])
+                count += 1
+            if langs:
+                snap.write(json.dumps([current, langs], ensure_ascii=False, separators=(",", ":")) + "\n")
+        return count
+    def import_snapshot(self, src) -> Dict[str, int]:
+        """
+        Führt einen Snapshot mit dem Cache zusammen: neue Einträge werden
+        übernommen, bestehende nur, wenn der Snapshot-Eintrag jünger ist.
+        """
+        def _rows():
+            for line in snap:
+                orig, langs = json.loads(line)
+                for lang, trans, updated in langs:
+                    yield orig, lang, trans, updated
+        with gzip.open(src, "rt", encoding="utf-8") as snap:
+            header = json.loads(snap.readline() or "{}")
+            if header.get("format") != self.SNAPSHOT_FORMAT:
+                raise ValueError("Kein Übersetzungs-Cache-Snapshot")
+            if header.get("version", 0) > self.SNAPSHOT_VERSION:
+                raise ValueError(f"Snapshot-Version {header.get('version')} ist neuer als dieses Skript")
+            with self.lock:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    """INSERT INTO tcache (orig, lang, trans, updated) VALUES (?,?,?,?)
+                       ON CONFLICT(orig, lang) DO UPDATE SET trans=excluded.trans, updated=excluded.updated
+                       WHERE excluded.updated > tcache.updated""", _rows())
+                self.conn.commit()
+                changed = self.conn.total_changes - before
+        return {"entries": header.get("entries", 0), "merged": changed}
+    def reverse_index(self) -> Tuple[set, Dict[str, set]]:
+        """(alle deutschen Originale, Übersetzung → Sprachen) für Rückschlüsse auf die Sprache eines Tags."""
+        originals: set = set()
+        langs_by_trans: Dict[str, set] = {}
+        with self.lock:
+            for orig, lang, trans in self.conn.execute("SELECT orig, lang, trans FROM tcache"):
+                originals.add(orig)
+                langs_by_trans.setdefault(trans, set()).add(lang)
+        return originals, langs_by_trans
+class CircuitOpenError(RuntimeError):
+    """Endpunkt ist gesperrt (Circuit Breaker offen) – sofort abbrechen statt warten."""
+
+class RetryBudget:
+    """
+    Prozessweites Retry-Budget (Token-Bucket wie gRPC-Retry-Throttling): jeder
+    Fehlschlag kostet ein Token, jeder Erfolg bringt RETRY_BUDGET_RATIO zurück.
+    Unter der Hälfte des Maximums werden keine Retries mehr erlaubt.
+    """
+    def __init__(self, max_tokens: float, ratio: float):
+        self.max_tokens = max_tokens
+        self.ratio = ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+    def record_success(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+    def try_spend(self) -> bool:
+        """Verbucht einen Fehlschlag; True, wenn noch ein Retry erlaubt ist."""
+        with self._lock:
+            self._tokens = max(0.0, self._tokens - 1)
+            return self._tokens > self.max_tokens / 2
+
+class CircuitBreaker:
+    """
+    Pro Endpunkt: nach BREAKER_FAILURE_THRESHOLD Fehlschlägen in Folge offen für
+    BREAKER_COOLDOWN_SECONDS, danach darf ein einzelner Probe-Aufruf durch (half-open).
+    """
+    def __init__(self, name: str, threshold: int, cooldown: float):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at >= self.cooldown and not self._probing:
+                self._probing = True  # half-open: genau ein Probe-Aufruf
+                return
+        raise CircuitOpenError(f"Circuit Breaker '{self.name}' offen – Aufruf übersprungen.")
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                log.info("Circuit Breaker '%s' wieder geschlossen.", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.threshold):
+                log.warning("Circuit Breaker '%s' geöffnet nach %d Fehlschlägen (Pause %.0fs).",
+                            self.name, self._failures, self.cooldown)
+                self._opened_at = time.monotonic()
+                self._probing = False
+retry_budget = RetryBudget(RETRY_BUDGET_TOKENS, RETRY_BUDGET_RATIO)
+breakers: Dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS)
+    for name in ("gemini-image", "gemini-translate", "storage", "firestore")
+}
 # KORRIGIERT: Flexible Cache-Pfade
 os.makedirs(CACHE_DIRECTORY, exist_ok=True)
 cache = TranslationCache(CACHE_DIRECTORY / "translation_cache.db")
+# ──────────────────────── PROFILING ────────────────────────
+class Profiler:
+    """
+    Opt-in (PROFILE=1): sammelt Spans als Chrome/Perfetto-Trace-Events (Wall- und
+    CPU-Zeit, tracemalloc-Speicher), behält cProfile-Daten der PROFILE_SLOWEST_N
+    langsamsten Bilder und schreibt am Ende alles nach PROFILE_DIR. Ab Python 3.12
+    darf prozessweit nur ein Profiler aktiv sein, daher läuft cProfile immer nur
+    für ein Bild gleichzeitig; parallele Bilder bekommen nur Spans.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._events: List[dict] = []
+        self._thread_names: Dict[int, str] = {}
+        self._slowest: List[Tuple[float, int, str, cProfile.Profile]] = []
+        self._counter = 0
+        self._t0 = time.perf_counter_ns()
+    def add(self, name: str, cat: str, start_ns: int, end_ns: int, args: dict):
+        thread = threading.current_thread()
+        event = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+                 "ts": (start_ns - self._t0) / 1000, "dur": (end_ns - start_ns) / 1000, "args": args}
+        with self._lock:
+            self._events.append(event)
+            # Namen jetzt merken – beim Export sind die Pool-Threads schon beendet
+            self._thread_names[thread.ident] = thread.name
+    def profile_image(self, func, png_path: Path, *args):
+        """
+        Führt ein Bild unter cProfile aus, sofern gerade kein anderes Bild profiliert
+        wird; nur die langsamsten N Profile werden behalten.
+        """
+        started = time.perf_counter()
+        with span("image", cat="image", file=png_path.name):
+            if not self._cprofile_lock.acquire(blocking=False):
+                return func(png_path, *args)
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:  # anderes Profiling-Werkzeug aktiv (sys.monitoring, 3.12+)
+                self._cprofile_lock.release()
+                return func(png_path, *args)
+            try:
+                return func(png_path, *args)
+            finally:
+                prof.disable()
+                self._cprofile_lock.release()
+                duration = time.perf_counter() - started
+                with self._lock:
+                    self._counter += 1
+                    heapq.heappush(self._slowest, (duration, self._counter, png_path.name, prof))
+                    if len(self._slowest) > PROFILE_SLOWEST_N:
+                        heapq.heappop(self._slowest)
+    def export(self) -> Path:
+        run_dir = PROFILE_DIR / dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+        run_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self._events)
+            slowest = sorted(self._slowest, reverse=True)
+            names = dict(self._thread_names)
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": names.get(tid, str(tid))}} for tid in {e["tid"] for e in events}]
+        (run_dir / "trace.json").write_text(json.dumps({"traceEvents": meta + events, "displayTimeUnit": "ms"}),
+                                            encoding="utf-8")
+        for rank, (duration, _, name, prof) in enumerate(slowest, 1):
+            prof.dump_stats(run_dir / f"slow-{rank:02d}-{Path(name).stem}.prof")
+            log.info("Profil #%d: %s – %.1fs", rank, name, duration)
+        log.info("Profiling: %d Spans, Trace unter %s (chrome://tracing oder ui.perfetto.dev)",
+                 len(events), run_dir / "trace.json")
+        return run_dir
+
+profiler = Profiler() if PROFILE else None
+_NO_SPAN = contextlib.nullcontext()
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "_start", "_cpu", "_mem")
+    def __init__(self, name: str, cat: str, args: dict):
+        self.name, self.cat, self.args = name, cat, args
+    def __enter__(self):
+        self._cpu = time.thread_time()
+        self._mem = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._start = time.perf_counter_ns()
+        return self
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        args = dict(self.args, cpu_ms=round((time.thread_time() - self._cpu) * 1000, 3))
+        if self._mem is not None:
+            # Nur das Delta: der tracemalloc-Peak ist prozessweit und über parallele Stufen nicht zuordenbar
+            args["mem_delta_kb"] = (tracemalloc.get_traced_memory()[0] - self._mem) // 1024
+        if exc[0] is not None:
+            args["error"] = exc[0].__name__
+        profiler.add(self.name, self.cat, self._start, end, args)
+        return False
+
+class _Stage:
+    """Setzt die Stufe für Log-Events, misst ihre Dauer und im Profiling-Modus zusätzlich einen Span."""
+    __slots__ = ("name", "_span", "_prev", "_start")
+    def __init__(self, name: str):
+        self.name = name
+        self._span = _Span(name, "stage", {}) if profiler is not None else None
+    def __enter__(self):
+        self._prev = getattr(_log_ctx, "stage", None)
+        _log_ctx.stage = self.name
+        if self._span is not None:
+            self._span.__enter__()
+        self._start = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        if self._span is not None:
+            self._span.__exit__(*exc)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Stufe %s: %.1f ms", self.name, duration_ms, extra={"duration_ms": round(duration_ms, 1)})
+        _log_ctx.stage = self._prev
+        return False
+
+def span(name: str, cat: str = "stage", **args):
+    """Misst einen Abschnitt im Profiling-Modus; sonst ein geteilter No-op-Kontext."""
+    if profiler is None:
+        return _NO_SPAN
+    return _Span(name, cat, args)
+
+def profiled(name: str):
+    """Decorator für ganze Pipeline-Stufen: Stufe im Log-Kontext, Dauer, Span im Profiling-Modus."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _log_image_done(res: str):
+    duration_ms = (time.perf_counter() - _log_ctx.started) * 1000
+    log_sampler.image_done()
+    log.info("Bild %s: %s nach %.0f ms", _log_ctx.image, res, duration_ms,
+             extra={"duration_ms": round(duration_ms, 1), "always": True})
+
+def run_image(png_path: Path, main_cat: str, sub_cat: str, lease_check=None) -> str | Future:
+    """
+    Einstieg pro Bild für die Worker: mit Profiling unter cProfile, sonst direkt.
+    Liefert den Status oder – wenn Uploads und Commit noch laufen – ein Future darauf.
+    """
+    _log_ctx.image, _log_ctx.hash = png_path.name, None
+    _log_ctx.verbose = log_sampler.keep_image()
+    _log_ctx.started = time.perf_counter()
+    res = "error"
+    try:
+        if profiler is None:
+            res = process_png(png_path, main_cat, sub_cat, lease_check)
+        else:
+            res = profiler.profile_image(process_png, png_path, main_cat, sub_cat, lease_check)
+        return res
+    finally:
+        if not isinstance(res, Future):
+            _log_image_done(res)
+        _log_ctx.__dict__.clear()
+
+_commit_pool = ThreadPoolExecutor(max_workers=UPLOAD_MAX_PENDING_IMAGES, thread_name_prefix="commit")
+_pending_images = threading.BoundedSemaphore(UPLOAD_MAX_PENDING_IMAGES)
+def defer_completion(finish) -> Future:
+    """
+    Abschluss eines Bilds (Uploads abwarten, Firestore-Commit, Aufräumen) im
+    Commit-Pool; der Worker beginnt derweil das nächste Bild. Sind bereits
+    UPLOAD_MAX_PENDING_IMAGES Bilder offen, wartet der Worker hier.
+    """
+    _pending_images.acquire()
+    def _run() -> str:
+        res = "error"
+        try:
+            res = finish()
+            return res
+        finally:
+            _pending_images.release()
+            _log_image_done(res)
+    return _commit_pool.submit(bind_log_context(_run))
 # ────────────────────── GEMINI CALLS ───────────────────────
-def smart_retry(max_retry: int = 4):
+TRANSIENT_ERRORS = (
+    google_api_exceptions.ResourceExhausted,
+    google_api_exceptions.TooManyRequests,
+    google_api_exceptions.InternalServerError,
+    google_api_exceptions.ServiceUnavailable,
+    google_api_exceptions.DeadlineExceeded,
+    http.client.RemoteDisconnected,
+    socket.timeout,
+    TimeoutError,
+    urllib3.exceptions.ProtocolError,
+    requests.exceptions.ConnectionError,
+)
+
+def _server_retry_delay(error: Exception) -> float | None:
+    """Vom Server vorgegebene Wartezeit (RetryInfo.retry_delay, Retry-After oder Text 'retry in Xs')."""
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None and hasattr(delay, "seconds"):
+            return delay.seconds + getattr(delay, "nanos", 0) / 1e9
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after)
+    match = re.search(r"retry(?:_delay)?\D{0,20}?(\d+(?:\.\d+)?)\s*s", str(error), re.I)
+    return float(match.group(1)) if match else None
+
+def smart_retry(max_retry: int = 4, endpoint: str = "gemini-translate", rate_limited: bool = True):
+    """
+    Retry mit Decorrelated Jitter (sleep = U(base, 3·vorheriger sleep), gedeckelt),
+    Server-Wartezeiten, prozessweitem Retry-Budget und Circuit Breaker pro Endpunkt.
+    Bei offenem Breaker wird sofort CircuitOpenError geworfen.
+    """
+    breaker = breakers[endpoint]
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            sleep = RETRY_BASE_DELAY
             for attempt in range(max_retry):
+                breaker.allow()
                 try:
-                    rate.wait()
-                    return func(*args, **kwargs)
-                except (
-                    google_api_exceptions.ResourceExhausted,
-                    google_api_exceptions.InternalServerError,
-                    google_api_exceptions.ServiceUnavailable,
-                    http.client.RemoteDisconnected,
-                    socket.timeout,
-                    TimeoutError,
-                    urllib3.exceptions.ProtocolError
-                ) as e:
+                    if rate_limited:
+                        rate.wait()
+                    result = func(*args, **kwargs)
+                except TRANSIENT_ERRORS as e:
+                    breaker.record_failure()
                     log.warning("%s fehlgeschlagen (%s). Versuch %d/%d", func.__name__, e, attempt+1, max_retry)
-                    time.sleep(2 ** attempt)
+                    if attempt + 1 >= max_retry:
+                        break
+                    if not retry_budget.try_spend():
+                        log.warning("Retry-Budget erschöpft – %s wird nicht wiederholt.", func.__name__)
+                        break
+                    hint = _server_retry_delay(e)
+                    sleep = min(RETRY_MAX_DELAY, random.uniform(RETRY_BASE_DELAY, sleep * 3))
+                    time.sleep(max(sleep, min(hint, RETRY_MAX_DELAY)) if hint is not None else sleep)
                 except Exception as e:
+                    breaker.record_success()  # Endpunkt hat geantwortet, nur nicht wie erwartet
                     log.error("%s unerwarteter Fehler: %s.", func.__name__, e, exc_info=True)
                     raise
-            raise RuntimeError(f"{func.__name__} permanent fehlgeschlagen nach {max_retry} Versuchen.")
+                else:
+                    breaker.record_success()
+                    retry_budget.record_success()
+                    return result
+            raise RuntimeError(f"{func.__name__} permanent fehlgeschlagen nach {attempt + 1} Versuchen.")
         return wrapper
     return decorator
-@smart_retry()
+@profiled("gemini-analyse")
+@smart_retry(endpoint="gemini-image")
 def analyze_image(png_path: Path) -> Tuple[str, List[str]]:
     with Image.open(png_path) as img:
         prompt = (
@@ -279,12 +941,22 @@ def analyze_image(png_path: Path) -> Tuple[str, List[str]]:
         if not motif or not tags:
             log.warning("Gemini Analyse für %s unvollständig: Motiv='%s', Tags='%s'. Antwort: %s", png_path.name, motif, tags, text_content)
         return motif, tags
-@smart_retry()
-def translate_batch(title: str, tags: List[str], lang_name: str, lang_code: str) -> Tuple[str, List[str]]:
+def cached_translation(title: str, tags: List[str], lang_code: str) -> Tuple[str, List[str]] | None:
+    """Titel + Tags aus dem Cache, falls vollständig vorhanden (ohne Gemini-Aufruf)."""
     cached_title = cache.get(title, lang_code)
     cached_tags = [cache.get(t, lang_code) for t in tags]
     if cached_title and all(cached_tags):
         return cached_title, cached_tags
+    return None
+@profiled("übersetzung")
+def translate_batch(title: str, tags: List[str], lang_name: str, lang_code: str) -> Tuple[str, List[str]]:
+    # Cache-Treffer vor dem RateLimiter prüfen – sie verbrauchen keinen Gemini-Slot
+    cached = cached_translation(title, tags, lang_code)
+    if cached:
+        return cached
+    return _translate_remote(title, tags, lang_name, lang_code)
+@smart_retry(endpoint="gemini-translate")
+def _translate_remote(title: str, tags: List[str], lang_name: str, lang_code: str) -> Tuple[str, List[str]]:
     prompt = (
         f"Übersetze folgenden Titel und die Tags ins {lang_name}.\n"
         "Antwortformat GENAU so:\nTITEL: <...>\nTAGS: <tag1, tag2, ...>\n\n"
@@ -338,6 +1010,7 @@ def check_potrace():
         raise SystemExit("potrace --version fehlgeschlagen.")
 
 # ──────────────── SVG PROCESSING FUNKTIONEN ────────────────
+@profiled("black-fill-regex")
 def _ensure_black_fill_and_stroke(svg_content: str) -> str:
     def _replace_style(match: re.Match) -> str:
         style = match.group(1)
@@ -350,9 +1023,10 @@ def _ensure_black_fill_and_stroke(svg_content: str) -> str:
     svg_content = re.sub(r'style="([^"]*)"', _replace_style, svg_content)
     svg_content = re.sub(r'fill="[^"]*"', 'fill="#000000"', svg_content)
     svg_content = re.sub(r'stroke="[^"]*"', 'stroke="none"', svg_content)
-    log.info("Erzwungene schwarze Füllung und keine Striche in SVG.")
+    log.debug("Erzwungene schwarze Füllung und keine Striche in SVG.")
     return svg_content
 
+@profiled("preprocess")
 def preprocess_png(src: Path, dest: Path) -> None:
     img = Image.open(src).convert("L")
     img = ImageOps.autocontrast(img)
@@ -377,6 +1051,7 @@ def _get_svg_bounds(svg_path: Path) -> Tuple[float, float, float, float]:
         h = float(root.get("height", "0").replace("px", "") or 1)
     return x, y, w, h
 
+@profiled("validate-svg")
 def _validate_svg(svg_path: Path) -> bool:
     try:
         tree = ET.parse(svg_path)
@@ -412,13 +1087,22 @@ def _validate_svg(svg_path: Path) -> bool:
             return False
     return True
 
-def _validate_thumbnail(png_path: Path) -> bool:
+def _validate_thumbnail(png_path: Path | bytes, variants: ThumbVariants | None = None,
+                        expected_width: int = TARGET_THUMB_WIDTH_PX) -> bool:
+    """
+    Prüft das Haupt-Thumbnail und (optional) jede Variante aus create_thumbnail.
+    """
+    for fmt, by_width in (variants or {}).items():
+        for width, data in by_width.items():
+            if not _validate_thumbnail(data, expected_width=width):
+                log.error("Thumbnail-Variante %s/%dpx ungültig.", fmt, width)
+                return False
     try:
-        img = Image.open(png_path)
+        img = Image.open(io.BytesIO(png_path) if isinstance(png_path, bytes) else png_path)
     except Exception as e:
         log.error("Thumbnail konnte nicht geöffnet werden: %s", e)
         return False
-    if img.width != TARGET_THUMB_WIDTH_PX:
+    if img.width != expected_width:
         log.error("Thumbnail-Breite falsch: %d", img.width)
         return False
     expected_ratio = A4_HEIGHT_MM / A4_WIDTH_MM
@@ -432,17 +1116,103 @@ def _validate_thumbnail(png_path: Path) -> bool:
         return False
     return True
 
-# Tools prüfen
-check_inkscape()
+def check_thumbnail_formats():
+    global THUMB_FORMATS
+    Image.init()
+    supported = []
+    for fmt in THUMB_FORMATS:
+        if fmt not in THUMB_MIME:
+            log.warning("Unbekanntes Thumbnail-Format '%s' in THUMB_FORMATS – ignoriert.", fmt)
+        elif fmt.upper() not in Image.SAVE:
+            log.warning("Pillow unterstützt kein %s-Encoding – Format wird übersprungen.", fmt.upper())
+        else:
+            supported.append(fmt)
+    THUMB_FORMATS = supported
+
+# Tools prüfen (Inkscape nur, wenn es die Thumbnails rendert)
+if THUMB_ENGINE not in ("inkscape", "bitmap"):
+    raise SystemExit(f"Unbekannte THUMB_ENGINE '{THUMB_ENGINE}' (inkscape oder bitmap).")
+if THUMB_ENGINE == "inkscape":
+    check_inkscape()
 check_potrace()
+check_thumbnail_formats()
 # ──────────────── STORAGE & KATEGORIEN ────────────────────
-def upload(local: Path, blob_name: str, mime: str) -> str:
-    log.info("Hochladen von %s zu Firebase Storage (%s)...", local.name, blob_name)
-    blob = _bucket.blob(blob_name)
-    blob.upload_from_filename(str(local), content_type=mime)
+def _md5_b64(data: bytes) -> str:
+    """MD5 im Format von Blob.md5_hash (Base64 des Digests)."""
+    return base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+@profiled("upload")
+@smart_retry(endpoint="storage", rate_limited=False)
+def upload(data: bytes, blob_name: str, mime: str) -> str:
+    """
+    Lädt Bytes direkt aus dem Speicher hoch. Dateien über
+    UPLOAD_RESUMABLE_THRESHOLD gehen als Resumable-Upload in Chunks.
+    """
+    if UPLOAD_SKIP_EXISTING:
+        existing = _bucket.get_blob(blob_name)
+        if existing is not None and existing.md5_hash == _md5_b64(data):
+            log.info("%s bereits identisch in Storage vorhanden – Upload übersprungen.", blob_name)
+            upload_stats.add("skipped", len(data))
+            return existing.name
+    log.info("Hochladen zu Firebase Storage (%s, %d Bytes)...", blob_name, len(data))
+    started = time.monotonic()
+    chunk_size = UPLOAD_CHUNK_SIZE if len(data) > UPLOAD_RESUMABLE_THRESHOLD else None
+    blob = _bucket.blob(blob_name, chunk_size=chunk_size)
+    blob.cache_control = UPLOAD_CACHE_CONTROL
+    blob.upload_from_string(data, content_type=mime)
+    upload_stats.add("uploaded", len(data), started)
     log.info("Hochladen erfolgreich: %s", blob_name)
     return blob.name
 
+_upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_PARALLEL, thread_name_prefix="upload")
+def upload_async(data: bytes, blob_name: str, mime: str) -> Future:
+    """Reiht einen Upload in den Upload-Pool ein; die Bild-Worker laufen derweil weiter."""
+    return _upload_pool.submit(bind_log_context(upload), data, blob_name, mime)
+
+@profiled("dedup-check")
+@smart_retry(endpoint="firestore", rate_limited=False)
+def is_processed(file_hash: str) -> bool:
+    return _db.collection("processed_files").document(file_hash).get().exists
+
+# processed_files wird erst im Commit-Stage geschrieben – bis dahin hält dieser Prozess den Hash hier
+_inflight_lock = threading.Lock()
+_inflight_hashes: Dict[str, threading.Event] = {}
+
+def _claim_hash(file_hash: str) -> None:
+    """Wartet, solange eine identische Datei in diesem Prozess noch zwischen Analyse und Commit ist."""
+    while True:
+        with _inflight_lock:
+            busy = _inflight_hashes.get(file_hash)
+            if busy is None:
+                _inflight_hashes[file_hash] = threading.Event()
+                return
+        log.info("Identische Datei wird gerade verarbeitet (Hash: %s) – warte auf deren Abschluss.", file_hash)
+        busy.wait()
+
+def _release_hash(file_hash: str) -> None:
+    with _inflight_lock:
+        done = _inflight_hashes.pop(file_hash, None)
+    if done is not None:
+        done.set()
+
+@profiled("firestore-commit")
+@smart_retry(endpoint="firestore", rate_limited=False)
+def commit_batch(batch) -> None:
+    """Batch-Commit mit Retry; alle Batches hier bestehen aus idempotenten set/ArrayUnion-Writes."""
+    batch.commit()
+
+def blob_name_for(data: bytes, folder: str, slug: str, ext: str, variant: str | None = None) -> str:
+    """
+    Blob-Name für einen Upload. Mit CONTENT_ADDRESSED_BLOBS besteht der Name
+    nur aus dem Inhalts-Hash – der Slug stammt aus der (nicht deterministischen)
+    Gemini-Analyse und würde bei einem Retry einen neuen Namen ergeben.
+    """
+    base = hashlib.sha256(data).hexdigest()[:16] if CONTENT_ADDRESSED_BLOBS else slug
+    if variant is not None:
+        base += f"-{variant}"
+    return f"{folder}/{base}.{ext}"
+
+@profiled("sha256")
 def sha256(path: Path) -> str:
     h = hashlib.sha256()
     with open(path, "rb") as f:
@@ -450,53 +1220,101 @@ def sha256(path: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
+@smart_retry(endpoint="storage", rate_limited=False)
+def push_translation_snapshot(data: bytes) -> None:
+    """Ersetzt den Snapshot im Bucket (fester Name, daher ohne immutable-Caching)."""
+    blob = _bucket.blob(TRANSLATION_SNAPSHOT_BLOB)
+    blob.cache_control = "no-cache"
+    blob.upload_from_string(data, content_type="application/gzip")
+    log.info("Übersetzungs-Snapshot hochgeladen: %s (%d Bytes)", TRANSLATION_SNAPSHOT_BLOB, len(data))
+
+def pull_translation_snapshot(force: bool = False) -> Dict[str, int] | None:
+    """
+    Lädt den Snapshot aus dem Bucket und führt ihn mit dem lokalen Cache
+    zusammen. Der MD5 des zuletzt importierten Snapshots liegt neben dem
+    Cache; ein unveränderter Snapshot wird nicht erneut geladen.
+    """
+    _initialize_services()
+    marker = CACHE_DIRECTORY / "translation_snapshot.md5"
+    remote_md5 = _blob_md5(TRANSLATION_SNAPSHOT_BLOB)
+    if remote_md5 is None:
+        log.info("Kein Übersetzungs-Snapshot im Bucket (%s).", TRANSLATION_SNAPSHOT_BLOB)
+        return None
+    if not force and marker.exists() and marker.read_text(encoding="utf-8") == remote_md5:
+        log.info("Übersetzungs-Snapshot unverändert seit dem letzten Import.")
+        return None
+    result = cache.import_snapshot(io.BytesIO(download(TRANSLATION_SNAPSHOT_BLOB)))
+    marker.write_text(remote_md5, encoding="utf-8")
+    log.info("Übersetzungs-Snapshot importiert: %d Einträge, %d neu oder aktualisiert.",
+             result["entries"], result["merged"])
+    return result
+
+def _pull_translation_snapshot_at_startup():
+    """Snapshot-Import beim Start; ein Fehler darf den Lauf nicht verhindern."""
+    if not TRANSLATION_SNAPSHOT_PULL:
+        return
+    try:
+        pull_translation_snapshot()
+    except Exception as e:
+        log.warning("Übersetzungs-Snapshot konnte nicht geladen werden, starte mit kaltem Cache: %s", e)
+
 def translate_category_name(category_name: str) -> Dict[str, str]:
     """
     Übersetzt einen Kategorienamen in alle verfügbaren Sprachen
     """
     translations = {"de": category_name}  # Deutsch als Ausgangssprache
     
-    # Auswahl der wichtigsten Sprachen für Kategorien
-    priority_languages = {
-        "Englisch": "en",
-        "Spanisch": "es", 
-        "Französisch": "fr",
-        "Italienisch": "it",
-        "Portugiesisch": "pt",
-        "Niederländisch": "nl",
-        "Japanisch": "ja",
-        "Koreanisch": "ko",
-        "Mandarin": "zh",
-        "Russisch": "ru",
-        "Arabisch": "ar",
-        "Hindi": "hi",
-        "Türkisch": "tr"
-    }
-    
-    for lang_name, lang_code in priority_languages.items():
+    for lang_name, lang_code in CATEGORY_PRIORITY_LANGUAGES.items():
         try:
             # Verwende die bestehende Übersetzungsfunktion
             translated_name, _ = translate_batch(category_name, [], lang_name, lang_code)
             translations[lang_code] = translated_name
+        except CircuitOpenError:
+            raise  # keine Kategorie mit Fallback-Namen anlegen, Bild wird geparkt
         except Exception as e:
             log.warning("Übersetzung von '%s' nach %s fehlgeschlagen: %s", category_name, lang_name, e)
             translations[lang_code] = category_name  # Fallback zur ursprünglichen Sprache
     
     return translations
+def _cached_category_names(name: str, lang_codes) -> Tuple[Dict[str, str], List[str]]:
+    """Publish-First: Deutsch plus Cache-Treffer sofort, dazu die Sprachen, die der Backfill nachträgt."""
+    names = {"de": name}
+    missing: List[str] = []
+    for lang_code in lang_codes:
+        if lang_code == "de":
+            continue
+        cached = cache.get(name, lang_code)
+        if cached:
+            names[lang_code] = cached
+        else:
+            missing.append(lang_code)
+    return names, missing
+
+def _create_category(ref, doc: Dict[str, object], name: str, missing: List[str]) -> None:
+    """Legt die Kategorie an – mit fehlenden Sprachen im selben Batch wie ihr Backlog-Eintrag."""
+    batch = _db.batch()
+    batch.set(ref, doc)
+    if missing:
+        log.info("Publish-First: %d Sprachen der Kategorie '%s' werden nachgetragen.", len(missing), name)
+        batch.set(_db.collection(TRANSLATION_BACKLOG_COLLECTION).document(f"category-{ref.id}"), {
+            "categoryId": ref.id, "title": name, "tags": [],
+            "missing": missing, "ts": firestore.SERVER_TIMESTAMP,
+        })
+    commit_batch(batch)
+
 # KORRIGIERT: Kategorien basierend auf Ordnerstruktur (maincat_subcat)
+@profiled("kategorien")
 def create_categories(main_cat: str, sub_cat: str) -> str:
     """
     Erstellt Kategorien basierend auf Ordnerstruktur maincat_subcat
-    Subkategorie wird in alle 100 Sprachen übersetzt
+    Subkategorie wird in alle 100 Sprachen übersetzt; mit PUBLISH_FIRST nur
+    Deutsch plus Cache-Treffer, der Rest geht ins Übersetzungs-Backlog
     """
     _initialize_services()
     
     # Hauptkategorie erstellen/aktualisieren
     main_cat_id = re.sub(r"[^a-z0-9]+", "-", main_cat.lower())
     
-    # Multi-language names für Hauptkategorie mit echten Übersetzungen
-    main_cat_names = translate_category_name(main_cat)
-    
     # Altersgruppe basierend auf Kategorie bestimmen
     if "kleinkinder" in main_cat.lower() or "0-5" in main_cat:
         age_group = "0-5"
@@ -510,38 +1328,44 @@ def create_categories(main_cat: str, sub_cat: str) -> str:
     # Subkategorie basierend auf Ordnername erstellen
     sub_cat_id = re.sub(r"[^a-z0-9]+", "-", sub_cat.lower())
     
-    # Übersetze Subkategorie in alle 100 Sprachen
-    log.info("Übersetze Subkategorie '%s' in alle 100 Sprachen...", sub_cat)
-    sub_cat_translations = {}
-    sub_cat_translations["de"] = sub_cat  # Deutsch als Basis
-    
-    # Übersetze in alle verfügbaren Sprachen
-    for lang_name, lang_code in LANG_MAP.items():
-        if lang_code == "de":
-            continue
-            
-        try:
-            translated_name, _ = translate_batch(sub_cat, [], lang_name, lang_code)
-            sub_cat_translations[lang_code] = translated_name
-        except Exception as e:
-            log.warning("Übersetzung von '%s' nach %s fehlgeschlagen: %s", sub_cat, lang_name, e)
-            sub_cat_translations[lang_code] = sub_cat  # Fallback
-    
-    # Erstelle Subkategorie-Dokument
-    sub_cat_doc = {
-        "id": sub_cat_id,
-        "names": sub_cat_translations,  # Vollständige Übersetzungen in alle Sprachen
-        "iconUrl": f"https://storage.googleapis.com/{FIREBASE_BUCKET}/icons/{sub_cat_id}.png",
-        "subcategoryIds": [],  # Leer für Subkategorien
-        "ageGroup": age_group,
-        "parentCategoryId": main_cat_id,
-        "order": 0
-    }
-    
-    # Subkategorie erstellen (nur wenn noch nicht existiert)
+    # Subkategorie erstellen (nur wenn noch nicht existiert) – Übersetzungen nur dann anfragen
     sub_cat_ref = _db.collection("categories").document(sub_cat_id)
     if not sub_cat_ref.get().exists:
-        sub_cat_ref.set(sub_cat_doc)
+        sub_missing: List[str] = []
+        if PUBLISH_FIRST:
+            sub_cat_translations, sub_missing = _cached_category_names(sub_cat, LANG_MAP.values())
+        else:
+            # Übersetze Subkategorie in alle 100 Sprachen
+            log.info("Übersetze Subkategorie '%s' in alle 100 Sprachen...", sub_cat)
+            sub_cat_translations = {}
+            sub_cat_translations["de"] = sub_cat  # Deutsch als Basis
+        
+            # Übersetze in alle verfügbaren Sprachen
+            for lang_name, lang_code in LANG_MAP.items():
+                if lang_code == "de":
+                    continue
+                
+                try:
+                    translated_name, _ = translate_batch(sub_cat, [], lang_name, lang_code)
+                    sub_cat_translations[lang_code] = translated_name
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    log.warning("Übersetzung von '%s' nach %s fehlgeschlagen: %s", sub_cat, lang_name, e)
+                    sub_cat_translations[lang_code] = sub_cat  # Fallback
+    
+        # Erstelle Subkategorie-Dokument
+        sub_cat_doc = {
+            "id": sub_cat_id,
+            "names": sub_cat_translations,  # Vollständige Übersetzungen in alle Sprachen
+            "iconUrl": f"https://storage.googleapis.com/{FIREBASE_BUCKET}/icons/{sub_cat_id}.png",
+            "subcategoryIds": [],  # Leer für Subkategorien
+            "ageGroup": age_group,
+            "parentCategoryId": main_cat_id,
+            "order": 0
+        }
+    
+        _create_category(sub_cat_ref, sub_cat_doc, sub_cat, sub_missing)
         log.info("Subkategorie erstellt: %s (%s)", sub_cat_id, sub_cat)
     
     # Hauptkategorie erstellen/aktualisieren
@@ -549,10 +1373,15 @@ def create_categories(main_cat: str, sub_cat: str) -> str:
     main_cat_data = main_cat_ref.get()
     
     if not main_cat_data.exists:
+        main_missing: List[str] = []
+        if PUBLISH_FIRST:
+            main_names, main_missing = _cached_category_names(main_cat, CATEGORY_PRIORITY_LANGUAGES.values())
+        else:
+            main_names = translate_category_name(main_cat)  # Multi-language names mit echten Übersetzungen
         # Neue Hauptkategorie erstellen
         main_cat_doc = {
             "id": main_cat_id,
-            "names": main_cat_names,
+            "names": main_names,
             "iconUrl": f"https://storage.googleapis.com/{FIREBASE_BUCKET}/icons/{main_cat_id}.png",
             "subcategoryIds": [sub_cat_id],  # Reine Subkategorie-ID
             "ageGroup": age_group,
@@ -560,7 +1389,7 @@ def create_categories(main_cat: str, sub_cat: str) -> str:
             "order": 0
         }
         
-        main_cat_ref.set(main_cat_doc)
+        _create_category(main_cat_ref, main_cat_doc, main_cat, main_missing)
         log.info("Hauptkategorie '%s' erstellt mit Subkategorie: %s", main_cat, sub_cat_id)
     else:
         # Hauptkategorie existiert bereits - Subkategorie hinzufügen falls nicht vorhanden
@@ -574,13 +1403,218 @@ def create_categories(main_cat: str, sub_cat: str) -> str:
             log.info("Subkategorie '%s' zu Hauptkategorie '%s' hinzugefügt", sub_cat_id, main_cat_id)
     
     return sub_cat_id
+# ───────────────────── TAG-SUCHINDEX ──────────────────────
+def normalize_tag(tag: str) -> str:
+    """Einheitliche Schreibweise für Index und Suche (NFKC, casefold, einfache Leerzeichen)."""
+    return " ".join(unicodedata.normalize("NFKC", tag).casefold().split())
+
+def tag_fields(tags_by_lang: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Tags pro Sprache als eigene Felder tags_<sprache> (normalisiert) am Bild.
+    Die App sucht per array_contains auf dem Feld ihrer Sprache; es gibt keine
+    gemeinsamen Index-Dokumente, um die Worker konkurrieren oder die volllaufen.
+    """
+    return {f"tags_{lc}": sorted({normalize_tag(t) for t in tags} - {""}) for lc, tags in tags_by_lang.items()}
+
+def rebuild_tag_fields(page_size: int = 500) -> None:
+    """
+    Ergänzt die tags_<sprache>-Felder für den vorhandenen Katalog. Alte Dokumente
+    haben nur das kombinierte tags-Feld; die Sprache eines Tags wird über den
+    TranslationCache zurückgerechnet (Original = de, Übersetzung = ihre Sprache).
+    Der Katalog wird seitenweise per Dokument-ID-Cursor gelesen.
+    """
+    _initialize_services()
+    originals, langs_by_trans = cache.reverse_index()
+    writer = _db.bulk_writer()
+    base = _db.collection("images").select(["tags"]).order_by("__name__").limit(page_size)
+    images = unknown = 0
+    last = None
+    while True:
+        page = list((base.start_after(last) if last is not None else base).stream())
+        for snap in page:
+            tags_by_lang: Dict[str, List[str]] = {}
+            for tag in (snap.to_dict() or {}).get("tags", []):
+                langs = set(langs_by_trans.get(tag, ()))
+                if tag in originals:
+                    langs.add("de")
+                if not langs:
+                    unknown += 1
+                for lang_code in langs:
+                    tags_by_lang.setdefault(lang_code, []).append(tag)
+            if tags_by_lang:
+                writer.update(snap.reference, tag_fields(tags_by_lang))
+            images += 1
+        if len(page) < page_size:
+            break
+        last = page[-1]
+        log.info("Tag-Felder: %d Bilder verarbeitet...", images)
+    writer.close()
+    log.info("Tag-Felder neu aufgebaut: %d Bilder, %d Tags ohne bekannte Sprache übersprungen.", images, unknown)
+
+def benchmark_tag_search(tag: str, lang_code: str, runs: int = 5) -> None:
+    """
+    Vergleicht die Tag-Suche der App: array-contains über das kombinierte
+    tags-Feld ohne und mit Feldmaske sowie auf dem Sprachfeld tags_<sprache>
+    mit derselben Feldmaske – so trennt sich der Effekt der Maske von dem des
+    Sprachfelds. Gemessen werden Latenz (Median) und Payload (JSON-Größe der Dokumente).
+    """
+    _initialize_services()
+
+    def _payload(docs) -> int:
+        return sum(len(json.dumps(d.to_dict() or {}, default=str).encode("utf-8")) for d in docs)
+
+    def _combined():
+        return list(_db.collection("images").where("tags", "array_contains", tag).stream())
+
+    def _combined_masked():
+        return list(_db.collection("images").where("tags", "array_contains", tag)
+                    .select(TAG_SEARCH_FIELDS).stream())
+
+    def _per_language():
+        return list(_db.collection("images").where(f"tags_{lang_code}", "array_contains", normalize_tag(tag))
+                    .select(TAG_SEARCH_FIELDS).stream())
+
+    for name, search in (("tags", _combined), ("tags + select", _combined_masked),
+                         (f"tags_{lang_code} + select", _per_language)):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            docs = search()
+            timings.append(time.perf_counter() - started)
+        log.info("Tag-Suche '%s' [%s] via %s: %d Dokumente, %.1f KB, Median %.0f ms",
+                 tag, lang_code, name, len(docs), _payload(docs) / 1024,
+                 sorted(timings)[len(timings) // 2] * 1000)
+# ──────────────────── ÜBERSETZUNGS-BACKFILL ────────────────────
+LANG_NAMES: Dict[str, str] = {code: name for name, code in LANG_MAP.items()}
+
+def _apply_backfill(backlog_ref, entry: Dict[str, object], done: Dict[str, Tuple[str, List[str]]],
+                    finished: bool) -> None:
+    """
+    Schreibt nachgeholte Sprachen mit einem Batch: bei Bildern Titel, Tags und
+    Sprach-Tagfelder, bei Kategorien die Namen – zusammen mit dem Backlog-Eintrag.
+    """
+    batch = _db.batch()
+    if entry.get("categoryId"):
+        batch.update(_db.collection("categories").document(str(entry["categoryId"])),
+                     {f"names.{lc}": title for lc, (title, _) in done.items()})
+    else:
+        update: Dict[str, object] = {f"titles.{lc}": title for lc, (title, _) in done.items()}
+        if STORE_COMBINED_TAGS:
+            update["tags"] = firestore.ArrayUnion(sorted({t for _, tags in done.values() for t in tags}))
+        update.update(tag_fields({lc: tags for lc, (_, tags) in done.items()}))
+        batch.update(_db.collection("images").document(str(entry["imageId"])), update)
+    if finished:
+        batch.delete(backlog_ref)
+    else:
+        batch.update(backlog_ref, {"missing": firestore.ArrayRemove(list(done))})
+    commit_batch(batch)
+
+def backfill_translations(stop: threading.Event | None = None) -> int:
+    """
+    Arbeitet eine Seite des Übersetzungs-Backlogs ab (älteste zuerst) und lässt dem
+    Vordergrund BACKFILL_RESERVE_RPM Slots pro Minute. Sprachen, deren Übersetzung
+    fehlschlägt, bleiben im Backlog. Liefert die Zahl der nachgetragenen Sprachen.
+    """
+    _initialize_services()
+    stop = stop or threading.Event()
+    filled = 0
+    page = list(_db.collection(TRANSLATION_BACKLOG_COLLECTION).order_by("ts").limit(BACKFILL_PAGE_SIZE).stream())
+    for snap in page:
+        entry = snap.to_dict() or {}
+        missing = list(entry.get("missing", []))
+        if not missing:
+            snap.reference.delete()  # Altlast ohne offene Sprachen
+            continue
+        done: Dict[str, Tuple[str, List[str]]] = {}
+        failed = 0
+        parked = False
+        for lang_code in missing:
+            while rate.headroom() <= BACKFILL_RESERVE_RPM and not stop.is_set():
+                stop.wait(1)
+            if stop.is_set():
+                break
+            try:
+                done[lang_code] = translate_batch(entry["title"], entry["tags"], LANG_NAMES[lang_code], lang_code)
+            except CircuitOpenError as e:
+                log.info("Backfill pausiert: %s", e)
+                parked = True
+                break
+            except Exception as e:
+                failed += 1
+                log.warning("Backfill %s → %s fehlgeschlagen, bleibt im Backlog: %s", snap.id, lang_code, e)
+                continue
+            if len(done) >= BACKFILL_BATCH_LANGS:
+                filled += len(done)
+                missing = [lc for lc in missing if lc not in done]
+                # Letzter voller Block (Anzahl Sprachen Vielfaches der Blockgröße): Eintrag hier löschen
+                _apply_backfill(snap.reference, entry, done, finished=not missing)
+                done = {}
+        if done:
+            filled += len(done)
+            remaining = [lc for lc in missing if lc not in done]
+            _apply_backfill(snap.reference, entry, done, finished=not remaining)
+        if failed:
+            # ans Ende der Warteschlange, damit dauerhaft fehlschlagende Einträge nicht blockieren
+            snap.reference.update({"ts": firestore.SERVER_TIMESTAMP})
+        if stop.is_set() or parked:
+            break
+    return filled
+
+def translation_backlog_status() -> Dict[str, int]:
+    """Größe des Backlogs: Bilder und Kategorien mit fehlenden Sprachen und Summe der fehlenden Sprachen."""
+    _initialize_services()
+    col = _db.collection(TRANSLATION_BACKLOG_COLLECTION)
+    images = categories = missing = 0
+    for snap in col.select(["missing", "categoryId"]).stream():
+        entry = snap.to_dict() or {}
+        missing += len(entry.get("missing", []))
+        if entry.get("categoryId"):
+            categories += 1
+        else:
+            images += 1
+    return {"images": images, "categories": categories, "missingTranslations": missing}
+
+class TranslationBackfill(threading.Thread):
+    """Hintergrund-Worker im Publish-First-Modus: füllt das Backlog, solange Quota frei ist."""
+    def __init__(self, stop_when_empty: bool = False):
+        super().__init__(daemon=True, name="translation-backfill")
+        self.stop_when_empty = stop_when_empty
+        self._stop_event = threading.Event()
+        self.filled = 0
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                filled = backfill_translations(self._stop_event)
+            except Exception as e:
+                log.error("Übersetzungs-Backfill fehlgeschlagen: %s", e)
+                filled = 0
+            self.filled += filled
+            if filled == 0:
+                if self.stop_when_empty:
+                    return
+                self._stop_event.wait(BACKFILL_IDLE_SECONDS)
 # ───────────────────────── WORKER ───────────────────────────
-def process_png(png_path: Path, main_cat: str, sub_cat: str):
+def process_png(png_path: Path, main_cat: str, sub_cat: str, lease_check=None):
     log.info("Starte Verarbeitung von Bild: %s (Kategorie: %s/%s)", png_path.name, main_cat, sub_cat)
     _initialize_services()
     
     file_hash = sha256(png_path)
-    if _db.collection("processed_files").document(file_hash).get().exists:
+    _log_ctx.hash = file_hash
+    _claim_hash(file_hash)
+    try:
+        result = _process_claimed_png(png_path, main_cat, sub_cat, file_hash, lease_check)
+    except BaseException:
+        _release_hash(file_hash)
+        raise
+    if not isinstance(result, Future):
+        _release_hash(file_hash)
+    return result
+
+def _process_claimed_png(png_path: Path, main_cat: str, sub_cat: str, file_hash: str, lease_check=None):
+    if is_processed(file_hash):
         log.info("%s wurde bereits verarbeitet (Hash: %s) – übersprungen.", png_path.name, file_hash)
         return "skipped"
     
@@ -594,12 +1628,22 @@ def process_png(png_path: Path, main_cat: str, sub_cat: str):
     log.info("Analyse abgeschlossen: Motiv='%s', Tags='%s'", motif_de, tags_de)
     log.info("Schritt 2: Übersetze Metadaten...")
     translations = {}
+    missing_langs: List[str] = []
     for lang_name, lang_code in LANG_MAP.items():
         if lang_code == "de":
             translations[lang_code] = {"title": motif_de, "tags": tags_de}
+        elif PUBLISH_FIRST:
+            # Nur Cache-Treffer sofort übernehmen, der Rest geht ins Backlog
+            cached = cached_translation(motif_de, tags_de, lang_code)
+            if cached:
+                translations[lang_code] = {"title": cached[0], "tags": cached[1]}
+            else:
+                missing_langs.append(lang_code)
         else:
             translated_title, translated_tags = translate_batch(motif_de, tags_de, lang_name, lang_code)
             translations[lang_code] = {"title": translated_title, "tags": translated_tags}
+    if missing_langs:
+        log.info("Publish-First: %d Sprachen werden nachgetragen.", len(missing_langs))
     log.info("Übersetzungen abgeschlossen.")
     log.info("Schritt 3: Erstelle SVG und Thumbnail...")
     with tempfile.TemporaryDirectory() as tmp:
@@ -610,30 +1654,45 @@ def process_png(png_path: Path, main_cat: str, sub_cat: str):
 
         # SVG-Verarbeitung (vereinfacht für Beispiel)
         # SVG-Verarbeitung mit Kontrast-Boost und Qualitätsprüfung
-        trace_png_to_svg(png_path, svg_raw)
+        bitmap = trace_png_to_svg(png_path, svg_raw)
         create_a4_canvas(svg_raw, svg_a4)
-        create_thumbnail(svg_a4, thumb_png)
+        thumb_variants = create_thumbnail(svg_a4, thumb_png, bitmap if THUMB_ENGINE == "bitmap" else None)
 
         # Qualitätsprüfung der erzeugten Dateien
-        if not (_validate_svg(svg_a4) and _validate_thumbnail(thumb_png)):
+        if not (_validate_svg(svg_a4) and _validate_thumbnail(thumb_png, thumb_variants)):
             raise ValueError("Qualitätsprüfung fehlgeschlagen")
 
-        # Slug für eindeutige Dateinamen
+        # Slug für lesbare Dateinamen
         slug = re.sub(r"[^a-z0-9]+", "-", motif_de.lower())
         slug = slug[:50].strip('-') or "bild"
-        slug += "-" + uuid.uuid4().hex[:6]
+        # Inhaltsbasiert: Dokument-ID nur aus dem Datei-Hash, damit ein Retry dasselbe Dokument trifft
+        if CONTENT_ADDRESSED_BLOBS:
+            image_id = file_hash
+        else:
+            slug += "-" + uuid.uuid4().hex[:6]
+            image_id = slug
         
-        svg_blob_name = f"{main_cat}/{sub_cat}/{slug}.svg"
-        png_blob_name = f"{main_cat}/{sub_cat}/{slug}.png"
+        folder = f"{main_cat}/{sub_cat}"
+        svg_bytes = svg_a4.read_bytes()
+        thumb_bytes = thumb_png.read_bytes()
+        svg_blob_name = blob_name_for(svg_bytes, folder, slug, "svg")
+        png_blob_name = blob_name_for(thumb_bytes, folder, slug, "png")
         
-        log.info("Schritt 4: Lade Dateien zu Firebase Storage hoch...")
-        upload(svg_a4, svg_blob_name, "image/svg+xml")
-        upload(thumb_png, png_blob_name, "image/png")
+        log.info("Schritt 4: Lade Dateien zu Firebase Storage hoch (parallel)...")
+        pending_uploads = [upload_async(svg_bytes, svg_blob_name, "image/svg+xml"),
+                           upload_async(thumb_bytes, png_blob_name, "image/png")]
+        thumbnail_variants: Dict[str, Dict[str, str]] = {}
+        for fmt, by_width in thumb_variants.items():
+            for width, data in by_width.items():
+                blob_name = blob_name_for(data, folder, slug, fmt, variant=str(width))
+                pending_uploads.append(upload_async(data, blob_name, THUMB_MIME[fmt]))
+                thumbnail_variants.setdefault(fmt, {})[str(width)] = blob_name
         
+        # Kategorien werden angelegt, während die Uploads im Upload-Pool laufen
         log.info("Schritt 5: Erstelle Kategorien...")
         category_id = create_categories(main_cat, sub_cat)
         
-        log.info("Schritt 6: Speichere Metadaten in Firestore...")
+        log.info("Schritt 6: Bereite Metadaten für Firestore vor...")
         
         # Altersgruppe basierend auf Kategorie bestimmen
         if "kleinkinder" in main_cat.lower() or "0-5" in main_cat:
@@ -653,11 +1712,13 @@ def process_png(png_path: Path, main_cat: str, sub_cat: str):
         
         # KORRIGIERT: Bild-Metadaten für Flutter-App kompatible Struktur
         image_doc = {
-            "id": slug,
+            "id": image_id,
+            "slug": slug,
             "titles": {lc: d["title"] for lc, d in translations.items()},  # KORRIGIERT: title → titles
             "ageGroup": age_group,  # KORRIGIERT: ageGroup hinzugefügt
-            "tags": combined_tags,  # KORRIGIERT: tags als Liste statt Dictionary
+            "tags": combined_tags if STORE_COMBINED_TAGS else [],  # KORRIGIERT: tags als Liste statt Dictionary
             "thumbnailPath": png_blob_name,  # Pfad für Flutter-App
+            "thumbnailVariants": thumbnail_variants,  # {format: {breite: pfad}}
             "svgPath": svg_blob_name,        # Pfad für Flutter-App
             "categoryId": category_id,       # Direkte Referenz zur Subkategorie (reine ID)
             "isNew": True,
@@ -665,24 +1726,464 @@ def process_png(png_path: Path, main_cat: str, sub_cat: str):
             "timestamp": firestore.SERVER_TIMESTAMP,  # KORRIGIERT: korrekte Timestamp-Verwendung
         }
         
-        # KORRIGIERT: Bild in flacher collection speichern
-        _db.collection("images").document(slug).set(image_doc)
+        image_doc.update(tag_fields({lc: d["tags"] for lc, d in translations.items()}))
         
-        # Hash als verarbeitet markieren
-        _db.collection("processed_files").document(file_hash).set({"ts": firestore.SERVER_TIMESTAMP})
+        # KORRIGIERT: Bild in flacher collection speichern – zusammen mit Backlog-Eintrag und
+        # processed_files in einem Batch
+        batch = _db.batch()
+        batch.set(_db.collection("images").document(image_id), image_doc)
+        
+        if missing_langs:
+            batch.set(_db.collection(TRANSLATION_BACKLOG_COLLECTION).document(image_id), {
+                "imageId": image_id, "title": motif_de, "tags": tags_de,
+                "missing": missing_langs, "ts": firestore.SERVER_TIMESTAMP,
+            })
         
-        log.info("Metadaten in Firestore gespeichert.")
+        # Hash als verarbeitet markieren
+        batch.set(_db.collection("processed_files").document(file_hash), {"ts": firestore.SERVER_TIMESTAMP})
+
+    def _finish() -> str:
+        try:
+            # Erst wenn alle Dateien im Storage liegen, wird das Bild in Firestore sichtbar
+            for fut in pending_uploads:
+                fut.result()
+            if lease_check is not None and not lease_check():
+                raise LeaseLostError(f"Lease für {png_path.name} verloren – Commit verworfen.")
+            commit_batch(batch)
+            log.info("Metadaten in Firestore gespeichert.")
+        finally:
+            _release_hash(file_hash)
         png_path.unlink(missing_ok=True)
         log.info("Bild %s vollständig verarbeitet und hochgeladen. Original-PNG gelöscht.", png_path.name)
         return "processed"
+    return defer_completion(_finish)
+# ─────────────────── VERTEILTE WORK-QUEUE ───────────────────
+class QueueItem(NamedTuple):
+    id: str
+    path: str  # relativ zu BASE_IMAGE_DIRECTORY (POSIX)
+    main_cat: str
+    sub_cat: str
+    attempts: int
+
+# leaseUntil für abgeschlossene Einträge: nie wieder "abgelaufen"
+LEASE_NEVER = float(2 ** 53)
+
+def queue_item_id(png_path: Path) -> str:
+    """Stabile ID aus relativem Pfad, Größe und mtime – gleich auf allen Hosts mit gemeinsamem Inbox-Mount."""
+    st = png_path.stat()
+    rel = png_path.relative_to(BASE_IMAGE_DIRECTORY).as_posix()
+    return hashlib.sha1(f"{rel}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+
+class WorkQueue:
+    """
+    Schnittstelle für Lease-basierte Queues. Ein Eintrag ist beanspruchbar,
+    solange er "pending" ist oder sein Lease abgelaufen ist (Worker abgestürzt).
+    """
+    def enqueue(self, items: List[Tuple[Path, str, str]]) -> int:
+        raise NotImplementedError
+    def claim(self, worker: str) -> QueueItem | None:
+        raise NotImplementedError
+    def heartbeat(self, item_id: str, worker: str) -> bool:
+        raise NotImplementedError
+    def complete(self, item: QueueItem, result: str) -> None:
+        raise NotImplementedError
+    def fail(self, item: QueueItem, error: str) -> None:
+        raise NotImplementedError
+    def release(self, item: QueueItem, delay: float) -> None:
+        """Eintrag ohne Versuchszählung zurückgeben (z. B. Circuit Breaker offen)."""
+        raise NotImplementedError
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+    def next_lease_expiry(self) -> float | None:
+        """Frühestes leaseUntil aller offenen Einträge (pending/leased); None, wenn nichts mehr offen ist."""
+        raise NotImplementedError
+
+class LeaseLostError(RuntimeError):
+    """Der Lease eines Eintrags gehört nicht mehr diesem Worker – Ergebnis wird verworfen."""
+
+class SQLiteWorkQueue(WorkQueue):
+    """Lokale Queue (ein Host, Tests). Claims laufen in BEGIN IMMEDIATE-Transaktionen."""
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS queue (
+                                id TEXT PRIMARY KEY, path TEXT, main_cat TEXT, sub_cat TEXT,
+                                state TEXT, worker TEXT, lease_until REAL, attempts INTEGER,
+                                result TEXT, last_error TEXT)""")
+        self.lock = threading.Lock()
+    def enqueue(self, items: List[Tuple[Path, str, str]]) -> int:
+        rows = [(queue_item_id(p), p.relative_to(BASE_IMAGE_DIRECTORY).as_posix(), mc, sc) for p, mc, sc in items]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("INSERT OR IGNORE INTO queue VALUES (?,?,?,?,'pending',NULL,0,0,NULL,NULL)", rows)
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+    def claim(self, worker: str) -> QueueItem | None:
+        with self.lock:
+            now = time.time()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("UPDATE queue SET state='failed', lease_until=? "
+                                  "WHERE state='leased' AND lease_until<? AND attempts>=?",
+                                  (LEASE_NEVER, now, QUEUE_MAX_ATTEMPTS))
+                row = self.conn.execute("SELECT id, path, main_cat, sub_cat, attempts FROM queue "
+                                        "WHERE state IN ('pending','leased') AND lease_until<? "
+                                        "ORDER BY attempts, lease_until LIMIT 1", (now,)).fetchone()
+                if row:
+                    self.conn.execute("UPDATE queue SET state='leased', worker=?, lease_until=?, attempts=attempts+1 "
+                                      "WHERE id=?", (worker, now + QUEUE_LEASE_SECONDS, row[0]))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return QueueItem(row[0], row[1], row[2], row[3], row[4] + 1) if row else None
+    def heartbeat(self, item_id: str, worker: str) -> bool:
+        with self.lock:
+            cur = self.conn.execute("UPDATE queue SET lease_until=? WHERE id=? AND worker=? AND state='leased'",
+                                    (time.time() + QUEUE_LEASE_SECONDS, item_id, worker))
+            return cur.rowcount == 1
+    def complete(self, item: QueueItem, result: str) -> None:
+        with self.lock:
+            self.conn.execute("UPDATE queue SET state='done', result=?, lease_until=? WHERE id=?",
+                              (result, LEASE_NEVER, item.id))
+    def fail(self, item: QueueItem, error: str) -> None:
+        final = item.attempts >= QUEUE_MAX_ATTEMPTS
+        with self.lock:
+            self.conn.execute("UPDATE queue SET state=?, last_error=?, lease_until=? WHERE id=?",
+                              ("failed" if final else "pending", error,
+                               LEASE_NEVER if final else time.time() + QUEUE_RETRY_DELAY * item.attempts, item.id))
+    def release(self, item: QueueItem, delay: float) -> None:
+        with self.lock:
+            self.conn.execute("UPDATE queue SET state='pending', attempts=attempts-1, lease_until=? WHERE id=?",
+                              (time.time() + delay, item.id))
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM queue GROUP BY state").fetchall())
+    def next_lease_expiry(self) -> float | None:
+        with self.lock:
+            return self.conn.execute("SELECT MIN(lease_until) FROM queue "
+                                     "WHERE state IN ('pending','leased')").fetchone()[0]
+
+class FirestoreWorkQueue(WorkQueue):
+    """
+    Multi-Host-Queue in Firestore. Beanspruchbare Einträge haben leaseUntil < jetzt
+    (pending = 0, abgelaufene Leases), daher reicht ein Single-Field-Index.
+    Jeder Claim ist eine Transaktion, sodass nur ein Host gewinnt.
+    """
+    def __init__(self, db: firestore.Client, collection: str):
+        self.db = db
+        self.col = db.collection(collection)
+    def enqueue(self, items: List[Tuple[Path, str, str]]) -> int:
+        added = 0
+        for start in range(0, len(items), 300):
+            chunk = items[start:start + 300]
+            refs = {queue_item_id(p): (p, mc, sc) for p, mc, sc in chunk}
+            existing = {snap.id for snap in self.db.get_all([self.col.document(i) for i in refs]) if snap.exists}
+            for item_id, (p, mc, sc) in refs.items():
+                if item_id in existing:
+                    continue
+                try:
+                    self.col.document(item_id).create({
+                        "path": p.relative_to(BASE_IMAGE_DIRECTORY).as_posix(),
+                        "mainCat": mc, "subCat": sc, "state": "pending", "worker": None,
+                        "leaseUntil": 0.0, "attempts": 0, "ts": firestore.SERVER_TIMESTAMP,
+                    })
+                    added += 1
+                except google_api_exceptions.AlreadyExists:
+                    pass  # anderer Host war schneller
+        return added
+    def _try_claim(self, ref, worker: str) -> QueueItem | None:
+        @firestore.transactional
+        def _txn(transaction) -> QueueItem | None:
+            d = ref.get(transaction=transaction).to_dict() or {}
+            now = time.time()
+            if d.get("state") not in ("pending", "leased") or d.get("leaseUntil", LEASE_NEVER) >= now:
+                return None
+            if d["attempts"] >= QUEUE_MAX_ATTEMPTS:
+                transaction.update(ref, {"state": "failed", "leaseUntil": LEASE_NEVER})
+                return None
+            transaction.update(ref, {"state": "leased", "worker": worker,
+                                     "leaseUntil": now + QUEUE_LEASE_SECONDS,
+                                     "attempts": d["attempts"] + 1})
+            return QueueItem(ref.id, d["path"], d["mainCat"], d["subCat"], d["attempts"] + 1)
+        return _txn(self.db.transaction())
+    def claim(self, worker: str) -> QueueItem | None:
+        while True:
+            candidates = list(self.col.where("leaseUntil", "<", time.time()).limit(QUEUE_CLAIM_BATCH).stream())
+            if not candidates:
+                return None
+            # Zufällige Reihenfolge, damit konkurrierende Hosts nicht um denselben Eintrag kämpfen
+            random.shuffle(candidates)
+            for snap in candidates:
+                item = self._try_claim(snap.reference, worker)
+                if item is not None:
+                    return item
+    def heartbeat(self, item_id: str, worker: str) -> bool:
+        ref = self.col.document(item_id)
+        @firestore.transactional
+        def _txn(transaction) -> bool:
+            d = ref.get(transaction=transaction).to_dict() or {}
+            if d.get("state") != "leased" or d.get("worker") != worker:
+                return False
+            transaction.update(ref, {"leaseUntil": time.time() + QUEUE_LEASE_SECONDS})
+            return True
+        return _txn(self.db.transaction())
+    def complete(self, item: QueueItem, result: str) -> None:
+        self.col.document(item.id).update({"state": "done", "result": result, "leaseUntil": LEASE_NEVER,
+                                           "ts": firestore.SERVER_TIMESTAMP})
+    def fail(self, item: QueueItem, error: str) -> None:
+        final = item.attempts >= QUEUE_MAX_ATTEMPTS
+        self.col.document(item.id).update({
+            "state": "failed" if final else "pending", "lastError": error[:1000],
+            "leaseUntil": LEASE_NEVER if final else time.time() + QUEUE_RETRY_DELAY * item.attempts,
+            "ts": firestore.SERVER_TIMESTAMP,
+        })
+    def release(self, item: QueueItem, delay: float) -> None:
+        self.col.document(item.id).update({"state": "pending", "attempts": firestore.Increment(-1),
+                                           "leaseUntil": time.time() + delay})
+    def stats(self) -> Dict[str, int]:
+        return {state: self.col.where("state", "==", state).count().get()[0][0].value
+                for state in ("pending", "leased", "done", "failed")}
+    def next_lease_expiry(self) -> float | None:
+        # done/failed stehen auf LEASE_NEVER, alles darunter ist noch offen
+        snaps = list(self.col.where("leaseUntil", "<", LEASE_NEVER).order_by("leaseUntil").limit(1).stream())
+        return snaps[0].get("leaseUntil") if snaps else None
+
+def open_work_queue(backend: str) -> WorkQueue:
+    if backend == "sqlite":
+        return SQLiteWorkQueue(QUEUE_SQLITE_PATH)
+    if backend == "firestore":
+        _initialize_services()
+        return FirestoreWorkQueue(_db, QUEUE_COLLECTION)
+    raise SystemExit(f"Unbekanntes QUEUE_BACKEND: {backend} (erlaubt: sqlite, firestore)")
+
+class LeaseHeartbeat(threading.Thread):
+    """Verlängert periodisch die Leases aller Einträge, die dieser Prozess gerade bearbeitet."""
+    def __init__(self, queue: WorkQueue, worker: str):
+        super().__init__(daemon=True, name="lease-heartbeat")
+        self.queue = queue
+        self.worker = worker
+        self._items: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+    def track(self, item_id: str):
+        with self._lock:
+            self._items.add(item_id)
+    def untrack(self, item_id: str):
+        with self._lock:
+            self._items.discard(item_id)
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+    def run(self):
+        while not self._stop_event.wait(QUEUE_LEASE_SECONDS / 3):
+            with self._lock:
+                items = list(self._items)
+            for item_id in items:
+                try:
+                    if not self.queue.heartbeat(item_id, self.worker):
+                        log.warning("Lease für Queue-Eintrag %s verloren – Ergebnis wird nicht committet.", item_id)
+                except Exception as e:
+                    log.warning("Heartbeat für %s fehlgeschlagen: %s", item_id, e)
+
+def run_work_queue(files_to_process: List[Tuple[Path, str, str]]) -> Dict[str, int]:
+    """
+    Queue-Modus: alle Hosts stellen die gefundenen Dateien ein (idempotent) und
+    bearbeiten dann atomar beanspruchte Einträge. Ist gerade nichts frei, aber
+    noch etwas offen (Retry-Wartezeit, geparkt, laufender Commit, Lease eines
+    anderen Hosts), warten die Worker bis zum frühesten Lease-Ablauf – höchstens
+    QUEUE_IDLE_POLL_SECONDS und nur bis ein eigener Eintrag abgeschlossen ist.
+    """
+    queue = open_work_queue(QUEUE_BACKEND)
+    log.info("Work-Queue (%s): %d neue Einträge, Worker-ID %s", QUEUE_BACKEND,
+             queue.enqueue(files_to_process), WORKER_ID)
+    heartbeat = LeaseHeartbeat(queue, WORKER_ID)
+    heartbeat.start()
+    stats = {"processed": 0, "skipped": 0, "parked": 0, "failed": 0, "lost": 0}
+    stats_lock = threading.Lock()
+
+    settled: List[Future] = []
+    idle = threading.Condition()
+
+    def _settle(item: QueueItem, outcome: "str | Future | Exception"):
+        """Schließt einen Eintrag ab – direkt oder, nach einem Commit im Commit-Pool, als Callback."""
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            res = outcome.result() if isinstance(outcome, Future) else outcome
+            queue.complete(item, res)
+            log.info("Status für %s: %s (Versuch %d)", item.path, res.upper(), item.attempts)
+        except LeaseLostError as e:
+            res = "lost"  # Eintrag gehört inzwischen einem anderen Worker, dort wird er abgeschlossen
+            log.warning("%s", e)
+        except CircuitOpenError as e:
+            res = "parked"
+            queue.release(item, BREAKER_COOLDOWN_SECONDS)
+            log.info("%s geparkt: %s", item.path, e)
+        except Exception as e:
+            res = "failed"
+            queue.fail(item, str(e))
+            log.error("Fehler für %s (Versuch %d/%d): %s", item.path, item.attempts, QUEUE_MAX_ATTEMPTS, e)
+        finally:
+            heartbeat.untrack(item.id)
+        with stats_lock:
+            stats[res] += 1
+        with idle:
+            idle.notify_all()  # untätige Worker prüfen sofort, ob noch etwas offen ist
+
+    def _worker_loop():
+        while True:
+            item = queue.claim(WORKER_ID)
+            if item is None:
+                wake_at = queue.next_lease_expiry()
+                if wake_at is None:
+                    return  # alles erledigt oder endgültig fehlgeschlagen
+                with idle:
+                    idle.wait(min(max(wake_at - time.time(), 1.0), QUEUE_IDLE_POLL_SECONDS))
+                continue
+            heartbeat.track(item.id)
+            png_path = BASE_IMAGE_DIRECTORY / item.path
+            # Vor dem Commit wird der Lease geprüft (und verlängert): kein doppeltes Veröffentlichen
+            lease_check = functools.partial(queue.heartbeat, item.id, WORKER_ID)
+            try:
+                if png_path.exists():
+                    res = run_image(png_path, item.main_cat, item.sub_cat, lease_check)
+                else:
+                    log.info("%s existiert nicht mehr (von anderem Host verarbeitet?) – übersprungen.", item.path)
+                    res = "skipped"
+            except Exception as e:
+                _settle(item, e)
+                continue
+            if isinstance(res, Future):
+                # Lease läuft weiter (Heartbeat), bis der Commit durch ist; der Worker holt schon das nächste Bild
+                done = Future()
+                def _on_done(fut: Future, item: QueueItem = item, done: Future = done):
+                    try:
+                        _settle(item, fut)
+                    finally:
+                        done.set_result(None)
+                res.add_done_callback(_on_done)
+                with stats_lock:
+                    settled.append(done)
+            else:
+                _settle(item, res)
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as pool:
+        for fut in [pool.submit(_worker_loop) for _ in range(MAX_PARALLEL)]:
+            fut.result()
+    for done in settled:
+        done.result()
+    heartbeat.stop()
+    log.info("Queue-Status: %s", queue.stats())
+    return stats
+# ──────────────────────── RUN-PLANER ───────────────────────
+def _category_translation_pairs(main_cat: str, sub_cat: str, existing: set) -> List[Tuple[str, str]]:
+    """(Text, Sprachcode)-Paare, die create_categories für noch nicht existierende Kategorien anfragt."""
+    pairs = []
+    if re.sub(r"[^a-z0-9]+", "-", main_cat.lower()) not in existing:
+        pairs += [(main_cat, lc) for lc in CATEGORY_PRIORITY_LANGUAGES.values()]
+    if re.sub(r"[^a-z0-9]+", "-", sub_cat.lower()) not in existing:
+        pairs += [(sub_cat, lc) for lc in LANG_MAP.values() if lc != "de"]
+    return pairs
+
+def plan_run(files: List[Tuple[Path, str, str]]) -> Dict[str, object]:
+    """
+    Schätzt einen Lauf, ohne etwas zu verändern: Hashes (parallel), Dedup-Status
+    und vorhandene Kategorien (gebündelte get_all-Reads), Cache-Treffer für
+    Kategorienamen, daraus Gemini-Requests, RateLimiter-Slots, Speicher und Laufzeit.
+    """
+    _initialize_services()
+    with ThreadPoolExecutor(max_workers=PLAN_HASH_WORKERS) as pool:
+        hashes = list(pool.map(lambda f: sha256(f[0]), files))
+
+    processed: set = set()
+    unique = list(dict.fromkeys(hashes))
+    for start in range(0, len(unique), 300):
+        refs = [_db.collection("processed_files").document(h) for h in unique[start:start + 300]]
+        processed.update(snap.id for snap in _db.get_all(refs, field_paths=["ts"]) if snap.exists)
+
+    new_files: List[Tuple[Path, str, str]] = []
+    seen: set = set()
+    for (path, main_cat, sub_cat), file_hash in zip(files, hashes):
+        if file_hash not in processed and file_hash not in seen:
+            seen.add(file_hash)
+            new_files.append((path, main_cat, sub_cat))
+
+    cat_ids = {re.sub(r"[^a-z0-9]+", "-", name.lower()) for _, mc, sc in new_files for name in (mc, sc)}
+    cat_refs = [_db.collection("categories").document(c) for c in cat_ids]
+    existing_cats = {snap.id for snap in _db.get_all(cat_refs, field_paths=["id"]) if snap.exists} if cat_refs else set()
+
+    # Kategorien: nur neue Kategorien werden (einmal) übersetzt; gecachte Paare gehen nicht an Gemini
+    category_pairs = {pair for _, mc, sc in new_files for pair in _category_translation_pairs(mc, sc, existing_cats)}
+    category_misses = sum(1 for text, lc in category_pairs if cache.get(text, lc) is None)
+    # Titel sind pro Bild neu → Titel+Tags-Übersetzung praktisch nie vollständig im Cache
+    per_image_translation_calls = len(LANG_MAP) - 1
+
+    n_new = len(new_files)
+    gemini_analysis = n_new
+    # Publish-First: Titel/Tag- und Kategorie-Übersetzungen laufen später im Backfill, nicht im Lauf selbst
+    foreground_translation_calls = 0 if PUBLISH_FIRST else n_new * per_image_translation_calls + category_misses
+    backfill_translation_calls = n_new * per_image_translation_calls + category_misses if PUBLISH_FIRST else 0
+    gemini_translation = foreground_translation_calls
+    # Cache-Treffer umgehen den RateLimiter, nur echte Gemini-Aufrufe belegen Slots
+    rate_slots = gemini_analysis + gemini_translation
+
+    megapixels = 0.0
+    input_bytes = 0
+    for path, _, _ in new_files:
+        with Image.open(path) as img:  # liest nur den Header
+            megapixels += img.width * img.height / 1e6
+        input_bytes += path.stat().st_size
+    n_variants = len(THUMB_WIDTHS) * len(THUMB_FORMATS)
+    storage_bytes = int(input_bytes * PLAN_SVG_BYTES_PER_PNG_BYTE
+                        + n_new * (1 + n_variants) * PLAN_THUMB_BYTES)
+
+    stage_seconds = {
+        "Gemini (RateLimiter %d rpm)" % GEMINI_RPM: rate_slots / GEMINI_RPM * 60,
+        "CPU (Tracing/Rendering, %d Worker)" % MAX_PARALLEL:
+            (n_new * PLAN_CPU_SECONDS_PER_IMAGE + megapixels * PLAN_CPU_SECONDS_PER_MPX) / max(1, MAX_PARALLEL),
+        "Upload (%.1f MB/s)" % (PLAN_UPLOAD_BYTES_PER_SECOND / 1e6): storage_bytes / PLAN_UPLOAD_BYTES_PER_SECOND,
+    }
+    bottleneck = max(stage_seconds, key=stage_seconds.get)
+    return {
+        "files": len(files),
+        "alreadyProcessed": len(files) - n_new,
+        "new": n_new,
+        "categoriesNew": len(cat_ids - existing_cats),
+        "categoryTranslationCacheHitRate": round(1 - category_misses / len(category_pairs), 3) if category_pairs else 1.0,
+        "geminiAnalysisRequests": gemini_analysis,
+        "geminiTranslationRequests": gemini_translation,
+        "deferredTranslationRequests": backfill_translation_calls,
+        "rateLimiterSlots": rate_slots,
+        "storageBytes": storage_bytes,
+        "stageSeconds": {k: round(v, 1) for k, v in stage_seconds.items()},
+        "estimatedWallSeconds": round(max(stage_seconds.values()), 1),
+        "bottleneck": bottleneck,
+    }
+
+def log_plan(plan: Dict[str, object]) -> None:
+    log.info("PLAN: %d Dateien, davon %d bereits verarbeitet/doppelt, %d neu (%d neue Kategorien)",
+             plan["files"], plan["alreadyProcessed"], plan["new"], plan["categoriesNew"])
+    log.info("PLAN: Gemini-Requests: %d Analyse + %d Übersetzung (Cache-Trefferquote Kategorien %.0f%%), %d RateLimiter-Slots",
+             plan["geminiAnalysisRequests"], plan["geminiTranslationRequests"],
+             plan["categoryTranslationCacheHitRate"] * 100, plan["rateLimiterSlots"])
+    if plan["deferredTranslationRequests"]:
+        log.info("PLAN: Publish-First: %d Übersetzungs-Requests landen im Backlog (Backfill danach ca. %.1f min)",
+                 plan["deferredTranslationRequests"], plan["deferredTranslationRequests"] / GEMINI_RPM)
+    log.info("PLAN: Speicher ca. %.1f MB", plan["storageBytes"] / 1e6)
+    for stage, seconds in plan["stageSeconds"].items():
+        log.info("PLAN:   %-40s %8.1f min", stage, seconds / 60)
+    log.info("PLAN: Geschätzte Laufzeit %.1f min – Engpass: %s",
+             plan["estimatedWallSeconds"] / 60, plan["bottleneck"])
+
 # ─────────────────────────── MAIN ──────────────────────────
-def main():
-    log.info("Starte Bildverarbeitung von Basis-Verzeichnis: %s", BASE_IMAGE_DIRECTORY)
+def scan_inbox() -> List[Tuple[Path, str, str]]:
+    """Findet alle PNGs in BASE_IMAGE_DIRECTORY/<Haupt>_<Sub>/ als (Pfad, Hauptkategorie, Subkategorie)."""
     files_to_process: List[Tuple[Path, str, str]] = []
     
     if not BASE_IMAGE_DIRECTORY.is_dir():
         log.error("FEHLER: Basis-Ordner nicht gefunden: %s", BASE_IMAGE_DIRECTORY)
-        return
+        return files_to_process
     
     for folder in BASE_IMAGE_DIRECTORY.iterdir():
         if folder.is_dir():
@@ -706,6 +2207,11 @@ def main():
                     len(png_files_in_folder), folder.name, main_cat, sub_cat)
         else:
             log.info("'%s' ist kein Verzeichnis. Übersprungen.", folder.name)
+    return files_to_process
+
+def main():
+    log.info("Starte Bildverarbeitung von Basis-Verzeichnis: %s", BASE_IMAGE_DIRECTORY)
+    files_to_process = scan_inbox()
     
     if not files_to_process:
         log.info("Keine PNGs gefunden. Beende.")
@@ -714,25 +2220,293 @@ def main():
     log.info("Beginne Verarbeitung von %d Bildern mit %d parallelen Prozessen...", 
              len(files_to_process), MAX_PARALLEL)
     
-    stats = {"processed": 0, "skipped": 0, "failed": 0}
+    stats = {"processed": 0, "skipped": 0, "parked": 0, "failed": 0}
+    _pull_translation_snapshot_at_startup()
+    if profiler is not None and PROFILE_MEMORY:
+        tracemalloc.start()
+    backfill = TranslationBackfill() if PUBLISH_FIRST else None
+    if backfill is not None:
+        _initialize_services()
+        backfill.start()
     
-    with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as pool:
-        futures = {pool.submit(process_png, p, mc, sc): p.name for p, mc, sc in files_to_process}
-        for fut in as_completed(futures):
-            png_name = futures[fut]
+    if QUEUE_BACKEND:
+        stats = run_work_queue(files_to_process)
+    else:
+        def _tally(fut: Future, png_name: str) -> Future | None:
             try:
                 res = fut.result()
+                if isinstance(res, Future):
+                    return res  # Uploads/Commit laufen noch im Commit-Pool
                 stats[res] += 1
                 log.info("Status für %s: %s", png_name, res.upper())
+            except CircuitOpenError as e:
+                # PNG bleibt im Inbox-Ordner und wird beim nächsten Lauf erneut versucht
+                stats["parked"] += 1
+                log.warning("%s geparkt: %s", png_name, e)
             except Exception as e:
                 stats["failed"] += 1
                 log.error("Unerwarteter Fehler für %s: %s", png_name, e)
+            return None
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL) as pool:
+            futures = {pool.submit(run_image, p, mc, sc): p.name for p, mc, sc in files_to_process}
+            deferred: Dict[Future, str] = {}
+            for fut in as_completed(futures):
+                completion = _tally(fut, futures[fut])
+                if completion is not None:
+                    deferred[completion] = futures[fut]
+            for fut in as_completed(deferred):
+                _tally(fut, deferred[fut])
 
+    _upload_pool.shutdown(wait=True)
+    if backfill is not None:
+        backfill.stop()
+        log.info("Übersetzungs-Backfill: %d Sprachen nachgetragen, Backlog: %s",
+                 backfill.filled, translation_backlog_status())
     log.info("VERARBEITUNG ABGESCHLOSSEN – Statistik: %s", stats)
+    log.info("Upload-Bilanz: %s", upload_stats.report())
+    if log_sampler.dropped:
+        log.info("Log-Sampling: %d INFO-Events verworfen (ab %d Bildern/min nur jedes %d. Bild)",
+                 log_sampler.dropped, log_sampler.above_ipm, log_sampler.every)
+    if profiler is not None:
+        profiler.export()
+
+# ───────────────────── KATALOG-RERENDER ─────────────────────
+_A4_SIZE_RE = re.compile(r'<svg[^>]*?\bwidth="([\d.]+)(?:px)?"[^>]*?\bheight="([\d.]+)(?:px)?"', re.S)
+_A4_GROUP_RE = re.compile(
+    r'<g transform="translate\(([-\d.]+),([-\d.]+)\) scale\(([-\d.]+)\)">(.*)</g>\s*</svg>', re.S)
+
+def _raw_svg_from_a4(svg_text: str) -> str | None:
+    """
+    Rekonstruiert das potrace-SVG aus einer mit create_a4_canvas erzeugten
+    A4-Datei. potrace-viewBoxen beginnen bei 0,0 und haben ganzzahlige
+    Pixelmaße. translate/scale sind gerundet gespeichert, daher wird um die
+    Schätzung herum die Größe gesucht, die exakt denselben Wrapper ergibt.
+    """
+    size = _A4_SIZE_RE.search(svg_text)
+    group = _A4_GROUP_RE.search(svg_text)
+    if not (size and group):
+        return None
+    page = (int(float(size.group(1))), int(float(size.group(2))))
+    tx, ty, scale = (float(group.group(i)) for i in (1, 2, 3))
+    if scale <= 0:
+        return None
+    stored = (group.group(1), group.group(2), group.group(3))
+    est_w = (page[0] - 2 * tx) / scale
+    est_h = (page[1] - 2 * ty) / scale
+    vb_w, vb_h = round(est_w, 3), round(est_h, 3)  # Fallback für nicht-ganzzahlige viewBoxen
+    candidates = sorted(((round(est_w) + dw, round(est_h) + dh) for dw in range(-3, 4) for dh in range(-3, 4)),
+                        key=lambda c: abs(c[0] - est_w) + abs(c[1] - est_h))
+    for w, h in candidates:
+        if w <= 0 or h <= 0:
+            continue
+        _, _, s2, tx2, ty2 = _a4_placement(0, 0, w, h, page)
+        if (f"{tx2:.3f}", f"{ty2:.3f}", f"{s2:.6f}") == stored:
+            vb_w, vb_h = w, h
+            break
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {vb_w} {vb_h}">\n'
+            f'{group.group(4).strip()}\n</svg>')
+
+def _rerender_stem(blob_path: str) -> str:
+    """Blob-Pfad ohne Endung und ohne Inhalts-Hash-Suffix früherer Rerender."""
+    stem = blob_path.rsplit(".", 1)[0]
+    return re.sub(r"-[0-9a-f]{12}$", "", stem)
+
+@profiled("download")
+@smart_retry(endpoint="storage", rate_limited=False)
+def download(blob_name: str) -> bytes:
+    return _bucket.blob(blob_name).download_as_bytes()
+
+@smart_retry(endpoint="storage", rate_limited=False)
+def _blob_md5(blob_name: str) -> str | None:
+    existing = _bucket.get_blob(blob_name)
+    return existing.md5_hash if existing is not None else None
+
+@profiled("rerender-image")
+def rerender_image(image_id: str, doc: Dict[str, object], old_svg: bytes, dry_run: bool = False) -> str:
+    """
+    Erzeugt A4-SVG, Thumbnail und Varianten eines Katalogbilds neu aus dem
+    gespeicherten SVG. Nur geänderte Ausgaben werden (unter einem neuen,
+    inhaltsbasierten Namen) hochgeladen und im Bild-Dokument eingetragen;
+    alte Blobs bleiben für gecachte Clients erhalten.
+    Rückgabe: "unchanged", "changed" (dry_run) oder "updated".
+    """
+    _log_ctx.image, _log_ctx.hash = image_id, None
+    raw = _raw_svg_from_a4(old_svg.decode("utf-8"))
+    if raw is None:
+        raise ValueError(f"SVG von {image_id} stammt nicht aus create_a4_canvas")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        svg_raw = tmp_path / "raw.svg"
+        svg_a4 = tmp_path / "a4.svg"
+        thumb_png = tmp_path / "thumb.png"
+        svg_raw.write_text(raw, encoding="utf-8")
+        create_a4_canvas(svg_raw, svg_a4)
+        thumb_variants = create_thumbnail(svg_a4, thumb_png)
+        if not (_validate_svg(svg_a4) and _validate_thumbnail(thumb_png, thumb_variants)):
+            raise ValueError("Qualitätsprüfung fehlgeschlagen")
+        svg_bytes = svg_a4.read_bytes()
+        thumb_bytes = thumb_png.read_bytes()
+
+    stem = _rerender_stem(str(doc["svgPath"]))
+    uploads: List[Tuple[bytes, str, str]] = []
+
+    def _target(old_path: str | None, data: bytes, target_stem: str, ext: str, mime: str,
+                old_data: bytes | None = None, variant: str | None = None) -> str:
+        if old_path:
+            same = data == old_data if old_data is not None else _blob_md5(old_path) == _md5_b64(data)
+            if same:
+                return old_path
+        # Neuer Inhalt bekommt immer einen neuen Namen – die Blobs sind immutable gecacht
+        if CONTENT_ADDRESSED_BLOBS:
+            name = blob_name_for(data, stem.rsplit("/", 1)[0], "", ext, variant)
+        else:
+            name = f"{target_stem}-{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+        uploads.append((data, name, mime))
+        return name
+
+    update: Dict[str, object] = {}
+    svg_path = _target(str(doc["svgPath"]), svg_bytes, stem, "svg", "image/svg+xml", old_data=old_svg)
+    if svg_path != doc["svgPath"]:
+        update["svgPath"] = svg_path
+    thumb_path = _target(doc.get("thumbnailPath"), thumb_bytes, stem, "png", "image/png")
+    if thumb_path != doc.get("thumbnailPath"):
+        update["thumbnailPath"] = thumb_path
+    old_variants = doc.get("thumbnailVariants") or {}
+    variants: Dict[str, Dict[str, str]] = {}
+    for fmt, by_width in thumb_variants.items():
+        for width, data in by_width.items():
+            old_path = (old_variants.get(fmt) or {}).get(str(width))
+            variants.setdefault(fmt, {})[str(width)] = _target(
+                old_path, data, f"{stem}-{width}", fmt, THUMB_MIME[fmt], variant=str(width))
+    if variants != old_variants:
+        update["thumbnailVariants"] = variants
+
+    if not update:
+        return "unchanged"
+    if dry_run:
+        log.info("Rerender %s: würde %s aktualisieren (%d Uploads).", image_id, ", ".join(update), len(uploads))
+        return "changed"
+    for fut in [upload_async(data, name, mime) for data, name, mime in uploads]:
+        fut.result()
+    batch = _db.batch()
+    batch.update(_db.collection("images").document(image_id), update)
+    commit_batch(batch)
+    log.info("Rerender %s: %s aktualisiert (%d Uploads).", image_id, ", ".join(update), len(uploads))
+    return "updated"
+
+def _load_rerender_state() -> Dict[str, object]:
+    if RERENDER_STATE_PATH.exists():
+        return json.loads(RERENDER_STATE_PATH.read_text(encoding="utf-8"))
+    return {"after": None, "counts": {}, "failed": []}
+
+def _save_rerender_state(state: Dict[str, object]) -> None:
+    RERENDER_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = RERENDER_STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(RERENDER_STATE_PATH)
+
+def rerender_catalog(dry_run: bool = False, limit: int | None = None, reset: bool = False,
+                     retry_failed: bool = False) -> Dict[str, int]:
+    """
+    Streamt die images-Collection seitenweise (nach Dokument-ID) und rendert
+    jedes Bild aus seinem gespeicherten SVG neu. Downloads laufen in einem
+    eigenen Pool und für die nächste Seite bereits, während die aktuelle auf
+    RERENDER_WORKERS Threads rendert (Inkscape/Pillow geben den GIL frei).
+    Nach jeder Seite wird der Cursor gesichert, ein Abbruch setzt dort fort.
+    Fehlgeschlagene IDs bleiben getrennt vom Cursor gespeichert, bis sie
+    gelingen; retry_failed bearbeitet nur diese.
+    Ohne Quell-Bitmap rendert immer Inkscape, auch bei THUMB_ENGINE=bitmap.
+    """
+    if THUMB_ENGINE != "inkscape":
+        check_inkscape()
+    _initialize_services()
+    state = _load_rerender_state()
+    if reset:
+        state.update({"after": None, "counts": {}})
+    failed = set(state.get("failed", []))
+    retry_ids = sorted(failed) if retry_failed else None
+    counts: Dict[str, int] = {} if retry_failed else state["counts"]
+    cursor: str | None = None if retry_failed else state["after"]
+    fields = ["svgPath", "thumbnailPath", "thumbnailVariants"]
+    col = _db.collection("images")
+    base = col.select(fields).order_by("__name__").limit(RERENDER_PAGE_SIZE)
+
+    def _page(after: str | None) -> list:
+        if retry_ids is not None:
+            chunk = [i for i in retry_ids if after is None or i > after][:RERENDER_PAGE_SIZE]
+            if not chunk:
+                return []
+            return sorted(_db.get_all([col.document(i) for i in chunk], field_paths=fields), key=lambda snap: snap.id)
+        query = base.start_after({"__name__": col.document(after)}) if after else base
+        return list(query.stream())
+
+    seen = 0
+    with ThreadPoolExecutor(RERENDER_DOWNLOAD_PARALLEL, thread_name_prefix="rerender-dl") as dl_pool, \
+         ThreadPoolExecutor(RERENDER_WORKERS, thread_name_prefix="rerender") as cpu_pool:
+
+        def _start(page: list) -> Tuple[list, Dict[Future, object]]:
+            return page, {dl_pool.submit(download, snap.get("svgPath")): snap
+                          for snap in page if (snap.to_dict() or {}).get("svgPath")}
+
+        if retry_ids is not None:
+            log.info("Rerender wiederholt %d fehlgeschlagene Bilder.", len(retry_ids))
+        elif cursor:
+            log.info("Rerender setzt nach %s fort (%s).", cursor, counts)
+        pending = _start(_page(cursor))
+        while pending and pending[0]:
+            page, downloads = pending
+            seen += len(page)
+            more = len(page) == RERENDER_PAGE_SIZE and not (limit and seen >= limit)
+            # Downloads der nächsten Seite laufen, während diese Seite rendert
+            pending = _start(_page(page[-1].id)) if more else None
+            # gelöschte Bilder müssen nicht mehr wiederholt werden
+            failed.difference_update(snap.id for snap in page if not snap.exists)
+            renders: Dict[Future, str] = {}
+            for fut in as_completed(downloads):
+                snap = downloads[fut]
+                try:
+                    renders[cpu_pool.submit(rerender_image, snap.id, snap.to_dict(), fut.result(), dry_run)] = snap.id
+                except Exception as e:
+                    counts["failed"] = counts.get("failed", 0) + 1
+                    failed.add(snap.id)
+                    log.error("Rerender %s: Download fehlgeschlagen: %s", snap.id, e)
+            for fut in as_completed(renders):
+                try:
+                    res = fut.result()
+                    failed.discard(renders[fut])
+                except Exception as e:
+                    res = "failed"
+                    failed.add(renders[fut])
+                    log.error("Rerender %s fehlgeschlagen: %s", renders[fut], e)
+                counts[res] = counts.get(res, 0) + 1
+            cursor = page[-1].id
+            if not retry_failed:
+                state["after"] = cursor
+            state["failed"] = sorted(failed)
+            if not dry_run:
+                _save_rerender_state(state)
+            log.info("Rerender: %d Bilder geprüft – %s", seen, counts)
+        if not (limit and seen >= limit) and not dry_run:
+            if failed:
+                log.warning("Rerender: %d Bilder fehlgeschlagen – mit --retry-failed erneut versuchen: %s",
+                            len(failed), ", ".join(sorted(failed)))
+            if not retry_failed:
+                log.info("Rerender vollständig, Cursor wird zurückgesetzt.")
+                state.update({"after": None, "counts": {}})
+            state["failed"] = sorted(failed)
+            _save_rerender_state(state)
+    _upload_pool.shutdown(wait=True)
+    log.info("Upload-Bilanz: %s", upload_stats.report())
+    return counts
 
 # Hilfsfunktionen bleiben gleich (vereinfacht für Beispiel)
-def trace_png_to_svg(png_path: Path, svg_out: Path):
-    """Vereinfachte Funktion - Implementation aus Original verwenden"""
+@profiled("trace")
+def trace_png_to_svg(png_path: Path, svg_out: Path) -> Image.Image:
+    """
+    Vektorisiert die vorverarbeitete Bitmap. Gibt diese Bitmap (Graustufen)
+    zurück; sie deckt sich mit der viewBox des SVGs (1 px = 1 Einheit).
+    """
     log.info("SVG-Erstellung für %s...", png_path.name)
     # Hier würde die Original-Implementation stehen
 
@@ -740,18 +2514,30 @@ def trace_png_to_svg(png_path: Path, svg_out: Path):
     with tempfile.TemporaryDirectory() as tdir:
         prep = Path(tdir) / "pre.png"
         preprocess_png(png_path, prep)
-        pgm = Path(tdir) / "pre.pgm"
-        Image.open(prep).convert("L").save(pgm)
-        cmd = [
-            POTRACE_PATH,
-            str(pgm),
-            "-s",
-            "-o",
-            str(svg_out),
-            "-k",
-            str(TRACE_THRESHOLD),
-        ]
-        try:
+        with Image.open(prep) as img:
+            img = img.convert("L")
+        if img.width * img.height > TILE_TRACE_MIN_PIXELS:
+            log.info("%s ist groß (%dx%d) – Vektorisierung in Kacheln.", png_path.name, img.width, img.height)
+            _trace_tiled(img, Path(tdir), svg_out, png_path.name)
+        else:
+            pgm = Path(tdir) / "pre.pgm"
+            img.save(pgm)
+            _run_potrace(pgm, svg_out, png_path.name)
+    log.info("Vektorisierung erfolgreich: %s", svg_out.name)
+    return img
+
+def _run_potrace(pgm: Path, svg_out: Path, label: str) -> None:
+    cmd = [
+        POTRACE_PATH,
+        str(pgm),
+        "-s",
+        "-o",
+        str(svg_out),
+        "-k",
+        str(TRACE_THRESHOLD),
+    ]
+    try:
+        with span("potrace", cat="subprocess", file=label):
             result = subprocess.run(
                 cmd,
                 check=True,
@@ -759,28 +2545,74 @@ def trace_png_to_svg(png_path: Path, svg_out: Path):
                 text=True,
                 timeout=120,
             )
-            if not svg_out.exists() or svg_out.stat().st_size == 0:
-                log.error("potrace hat keine SVG-Datei erstellt oder sie ist leer: %s. stdout: %s, stderr: %s",
-                          svg_out, result.stdout, result.stderr)
-                raise RuntimeError(f"potrace hat keine SVG-Datei erstellt oder sie ist leer: {svg_out}")
-        except subprocess.CalledProcessError as e:
-            log.error("potrace Vektorisierung fehlgeschlagen für %s: %s (stdout: %s, stderr: %s)",
-                      png_path.name, e, e.stdout, e.stderr)
-            raise
-    log.info("Vektorisierung erfolgreich: %s", svg_out.name)
+        if not svg_out.exists() or svg_out.stat().st_size == 0:
+            log.error("potrace hat keine SVG-Datei erstellt oder sie ist leer: %s. stdout: %s, stderr: %s",
+                      svg_out, result.stdout, result.stderr)
+            raise RuntimeError(f"potrace hat keine SVG-Datei erstellt oder sie ist leer: {svg_out}")
+    except subprocess.CalledProcessError as e:
+        log.error("potrace Vektorisierung fehlgeschlagen für %s: %s (stdout: %s, stderr: %s)",
+                  label, e, e.stdout, e.stderr)
+        raise
 
-def create_a4_canvas(svg_in: Path, svg_a4_out: Path):
-    """Vereinfachte Funktion - Implementation aus Original verwenden"""
-    log.info("A4-Canvas für %s...", svg_in.name)
-    # Hier würde die Original-Implementation stehen
+def _trace_tiled(img: Image.Image, tdir: Path, svg_out: Path, label: str) -> None:
+    """
+    Zerlegt die Bitmap in TILE_SIZE-Kacheln mit TILE_OVERLAP Rand, vektorisiert sie
+    parallel und setzt die Pfade wieder zusammen. Jede Kachel wird mit Kontext
+    (Überlappung) getract und per clipPath auf ihren Kern beschnitten; die Kerne
+    überlappen um TILE_SEAM_PX, damit beim Rendern keine Haarlinien an den Nähten entstehen.
+    """
+    width, height = img.size
+    white_level = 255 * float(TRACE_THRESHOLD)
+    tiles = []
+    for y0 in range(0, height, TILE_SIZE):
+        for x0 in range(0, width, TILE_SIZE):
+            core = (x0, y0, min(x0 + TILE_SIZE, width), min(y0 + TILE_SIZE, height))
+            box = (max(0, x0 - TILE_OVERLAP), max(0, y0 - TILE_OVERLAP),
+                   min(width, core[2] + TILE_OVERLAP), min(height, core[3] + TILE_OVERLAP))
+            tiles.append((core, box))
 
-    log.info("Erstelle exakte A4-Version von %s …", svg_in.name)
+    def _trace_tile(index: int) -> Path | None:
+        core, box = tiles[index]
+        tile = img.crop(box)
+        if tile.getextrema()[0] >= white_level:
+            return None  # komplett weiß, nichts zu vektorisieren
+        pgm = tdir / f"tile-{index}.pgm"
+        tile_svg = tdir / f"tile-{index}.svg"
+        tile.save(pgm)
+        _run_potrace(pgm, tile_svg, f"{label} [Kachel {index + 1}/{len(tiles)}]")
+        return tile_svg
 
-    dpi = DEFAULT_DPI
-    a4_w_px = int(A4_WIDTH_MM * dpi / 25.4)
-    a4_h_px = int(A4_HEIGHT_MM * dpi / 25.4)
+    with ThreadPoolExecutor(max_workers=TILE_WORKERS, thread_name_prefix="potrace-tile") as pool:
+        traced = list(pool.map(_trace_tile, range(len(tiles))))
 
-    vb_x, vb_y, vb_w, vb_h = _get_svg_bounds(svg_in)
+    clips, groups = [], []
+    for index, ((core, box), tile_svg) in enumerate(zip(tiles, traced)):
+        if tile_svg is None:
+            continue
+        match = re.search(r"<svg[^>]*?>(.*?)</svg>", tile_svg.read_text(encoding="utf-8"), re.S)
+        inner = re.sub(r"<metadata>.*?</metadata>", "", match.group(1) if match else "", flags=re.S).strip()
+        cx0, cy0 = core[0] - TILE_SEAM_PX, core[1] - TILE_SEAM_PX
+        cw, ch = core[2] - core[0] + 2 * TILE_SEAM_PX, core[3] - core[1] + 2 * TILE_SEAM_PX
+        clips.append(f'<clipPath id="tile{index}"><rect x="{cx0}" y="{cy0}" width="{cw}" height="{ch}"/></clipPath>')
+        groups.append(f'<g clip-path="url(#tile{index})"><g transform="translate({box[0]},{box[1]})">{inner}</g></g>')
+
+    svg_out.write_text(
+        f'<svg version="1.0" xmlns="http://www.w3.org/2000/svg" width="{width}pt" height="{height}pt" '
+        f'viewBox="0 0 {width} {height}" preserveAspectRatio="xMidYMid meet">\n'
+        f'<defs>{"".join(clips)}</defs>\n' + "\n".join(groups) + "\n</svg>\n",
+        encoding="utf-8",
+    )
+    log.info("%d/%d Kacheln vektorisiert und zusammengesetzt: %s", len(groups), len(tiles), svg_out.name)
+
+def _a4_placement(vb_x: float, vb_y: float, vb_w: float, vb_h: float,
+                  page: Tuple[int, int] | None = None) -> Tuple[int, int, float, float, float]:
+    """A4-Seitengröße in px sowie scale/tx/ty, die das Motiv mit 10 % Rand zentrieren."""
+    if page is not None:
+        a4_w_px, a4_h_px = page
+    else:
+        dpi = DEFAULT_DPI
+        a4_w_px = int(A4_WIDTH_MM * dpi / 25.4)
+        a4_h_px = int(A4_HEIGHT_MM * dpi / 25.4)
 
     max_w = 0.9 * a4_w_px
     max_h = 0.9 * a4_h_px
@@ -788,6 +2620,17 @@ def create_a4_canvas(svg_in: Path, svg_a4_out: Path):
 
     tx = (a4_w_px - vb_w * scale) / 2 - vb_x * scale
     ty = (a4_h_px - vb_h * scale) / 2 - vb_y * scale
+    return a4_w_px, a4_h_px, scale, tx, ty
+
+@profiled("a4-canvas")
+def create_a4_canvas(svg_in: Path, svg_a4_out: Path):
+    """Vereinfachte Funktion - Implementation aus Original verwenden"""
+    log.info("A4-Canvas für %s...", svg_in.name)
+    # Hier würde die Original-Implementation stehen
+
+    log.info("Erstelle exakte A4-Version von %s …", svg_in.name)
+
+    a4_w_px, a4_h_px, scale, tx, ty = _a4_placement(*_get_svg_bounds(svg_in))
 
     style_block = (
         "<style>path,rect,circle,ellipse,polygon,polyline,line"
@@ -813,37 +2656,226 @@ def create_a4_canvas(svg_in: Path, svg_a4_out: Path):
     svg_a4_out.write_text(result, encoding="utf-8")
     log.info("A4-SVG geschrieben: %s", svg_a4_out.name)
 
-def create_thumbnail(svg_path: Path, thumb_out: Path):
-    """Vereinfachte Funktion - Implementation aus Original verwenden"""
-    log.info("Thumbnail für %s...", svg_path.name)
-    # Hier würde die Original-Implementation stehen
-    log.info("Thumbnail für %s erstellen...", svg_path.name)
+def _encode_thumbnail(img: Image.Image, fmt: str) -> bytes:
+    """Kodiert ein Graustufen-Thumbnail im gewünschten Format."""
+    out = io.BytesIO()
+    if fmt == "webp":
+        img.save(out, "WEBP", quality=THUMB_WEBP_QUALITY, method=4)
+    elif fmt == "avif":
+        img.convert("RGB").save(out, "AVIF", quality=THUMB_AVIF_QUALITY)
+    elif THUMB_PALETTE_COLORS <= 2:
+        img.point(lambda v: 255 if v >= 128 else 0).convert("1").save(out, "PNG")
+    else:
+        img.quantize(colors=THUMB_PALETTE_COLORS).save(out, "PNG")
+    return out.getvalue()
+
+def _render_inkscape(svg_path: Path, render_png: Path, render_width: int) -> Image.Image:
+    """Rendert die A4-Seite mit Inkscape in render_width Pixeln Breite (weißer Hintergrund)."""
     cmd = [INKSCAPE_PATH, str(svg_path),
            "--export-type=png",
-           f"--export-width={TARGET_THUMB_WIDTH_PX}",
+           f"--export-width={render_width}",
            "--export-area-page",
            "--export-background=white",
-           "--export-filename", str(thumb_out)]
+           "--export-filename", str(render_png)]
     try:
-        result = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-        if not thumb_out.exists() or thumb_out.stat().st_size == 0:
+        with span("inkscape", cat="subprocess", width=render_width):
+            result = subprocess.run(
+                cmd,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+        if not render_png.exists() or render_png.stat().st_size == 0:
             log.error("Inkscape hat keine Thumbnail-Datei erstellt oder sie ist leer: %s. stdout: %s, stderr: %s",
-                      thumb_out, result.stdout, result.stderr)
-            raise RuntimeError(f"Inkscape hat keine Thumbnail-Datei erstellt oder sie ist leer: {thumb_out}")
-        img = Image.open(thumb_out)
-        img = ImageOps.autocontrast(img.convert("L")).convert("RGB")
-        img.save(thumb_out, optimize=True, compress_level=9)
+                      render_png, result.stdout, result.stderr)
+            raise RuntimeError(f"Inkscape hat keine Thumbnail-Datei erstellt oder sie ist leer: {render_png}")
     except subprocess.CalledProcessError as e:
         log.error("Inkscape Thumbnail-Erstellung fehlgeschlagen für %s: %s (stdout: %s, stderr: %s)",
                   svg_path.name, e, e.stdout, e.stderr)
         raise
-    log.info("Thumbnail erfolgreich: %s", thumb_out.name)
+    with Image.open(render_png) as rendered:
+        page = rendered.convert("L")
+    render_png.unlink(missing_ok=True)
+    return page
+
+def _render_bitmap(bitmap: Image.Image, render_width: int) -> Image.Image:
+    """
+    Setzt die vorverarbeitete Bitmap mit derselben Platzierung wie
+    create_a4_canvas auf eine weiße A4-Seite. Die Bitmap wird an der
+    potrace-Schwelle binarisiert und erst danach (geglättet) verkleinert,
+    was dem Inkscape-Render der Pfade bis auf Kurvenglättung entspricht.
+    """
+    a4_w_px, a4_h_px, scale, tx, ty = _a4_placement(0, 0, bitmap.width, bitmap.height)
+    factor = render_width / a4_w_px
+    page = Image.new("L", (render_width, round(a4_h_px * factor)), 255)
+    black_level = 255 * float(TRACE_THRESHOLD)
+    binary = bitmap.convert("L").point(lambda v: 0 if v < black_level else 255)
+    size = (max(1, round(bitmap.width * scale * factor)), max(1, round(bitmap.height * scale * factor)))
+    page.paste(binary.resize(size, Image.LANCZOS, reducing_gap=3.0), (round(tx * factor), round(ty * factor)))
+    return page
+
+@profiled("thumbnail")
+def create_thumbnail(svg_path: Path, thumb_out: Path, bitmap: Image.Image | None = None) -> ThumbVariants:
+    """
+    Rendert das A4-SVG einmal in der größten benötigten Breite und skaliert
+    im Speicher auf das Haupt-Thumbnail (TARGET_THUMB_WIDTH_PX, PNG) sowie alle
+    Varianten aus THUMB_WIDTHS × THUMB_FORMATS herunter. Mit bitmap (Rückgabe
+    von trace_png_to_svg) entsteht die Seite ohne Inkscape aus der Bitmap.
+    """
+    log.info("Thumbnail für %s erstellen...", svg_path.name)
+    render_width = max([TARGET_THUMB_WIDTH_PX, *THUMB_WIDTHS])
+    if bitmap is not None:
+        page = _render_bitmap(bitmap, render_width)
+    else:
+        page = _render_inkscape(svg_path, thumb_out.with_name(thumb_out.stem + "-render.png"), render_width)
+    master = ImageOps.autocontrast(page)
+
+    def _scaled(width: int) -> Image.Image:
+        if width == master.width:
+            return master
+        height = round(width * master.height / master.width)
+        return master.resize((width, height), Image.LANCZOS)
+
+    _scaled(TARGET_THUMB_WIDTH_PX).save(thumb_out, "PNG")
+    variants: ThumbVariants = {}
+    for width in THUMB_WIDTHS:
+        scaled = _scaled(width)
+        for fmt in THUMB_FORMATS:
+            variants.setdefault(fmt, {})[width] = _encode_thumbnail(scaled, fmt)
+    log.info("Thumbnail erfolgreich: %s (+%d Varianten)", thumb_out.name,
+             sum(len(v) for v in variants.values()))
+    return variants
+
+def compare_thumbnail_engines(png_path: Path) -> Dict[str, object]:
+    """
+    Erzeugt das Haupt-Thumbnail einer Vorlage mit beiden Engines und vergleicht
+    sie pixelweise: mittlere Grauwert-Abweichung und Anteil der Pixel, die um
+    mehr als 64 abweichen. Das Bitmap-Thumbnail muss außerdem
+    _validate_thumbnail bestehen.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        svg_raw, svg_a4 = tmp_path / "raw.svg", tmp_path / "a4.svg"
+        bitmap = trace_png_to_svg(png_path, svg_raw)
+        create_a4_canvas(svg_raw, svg_a4)
+        create_thumbnail(svg_a4, tmp_path / "inkscape.png")
+        variants = create_thumbnail(svg_a4, tmp_path / "bitmap.png", bitmap)
+        valid = _validate_thumbnail(tmp_path / "bitmap.png", variants)
+        with Image.open(tmp_path / "inkscape.png") as ref, Image.open(tmp_path / "bitmap.png") as cand:
+            if ref.size != cand.size:
+                return {"valid": valid, "meanDiff": 255.0, "pixelsOver64": 1.0}
+            diff = ImageChops.difference(ref.convert("L"), cand.convert("L"))
+    return {
+        "valid": valid,
+        "meanDiff": round(ImageStat.Stat(diff).mean[0], 3),
+        "pixelsOver64": round(sum(diff.histogram()[65:]) / (diff.width * diff.height), 5),
+    }
+
+# ─────────────────────────── CLI ───────────────────────────
+app = typer.Typer(add_completion=False, help="Printable Content-Pipeline")
+
+@app.callback(invoke_without_command=True)
+def _cli(ctx: typer.Context):
+    """Ohne Unterbefehl wird wie bisher das Inbox-Verzeichnis verarbeitet."""
+    if ctx.invoked_subcommand is None:
+        main()
+
+app.command("run", help="Inbox-Verzeichnis verarbeiten (Standard).")(main)
+
+@app.command("plan")
+def _cli_plan(as_json: bool = typer.Option(False, "--json", help="Plan als JSON ausgeben")):
+    """Lauf vorab schätzen (nur lesend): Gemini-Requests, Cache-Treffer, Speicher, Laufzeit, Engpass."""
+    files = scan_inbox()
+    plan = plan_run(files)
+    if as_json:
+        typer.echo(json.dumps(plan, indent=2, ensure_ascii=False))
+    else:
+        log_plan(plan)
+
+@app.command("backfill-translations")
+def _cli_backfill_translations():
+    """Übersetzungs-Backlog abarbeiten, bis es leer ist oder nur noch fehlschlagende Sprachen enthält."""
+    _pull_translation_snapshot_at_startup()
+    worker = TranslationBackfill(stop_when_empty=True)
+    worker.start()
+    worker.join()
+    log.info("%d Sprachen nachgetragen. Backlog: %s", worker.filled, translation_backlog_status())
+
+@app.command("backfill-status")
+def _cli_backfill_status():
+    """Größe des Übersetzungs-Backlogs anzeigen."""
+    status = translation_backlog_status()
+    log.info("Backlog: %d Bilder und %d Kategorien mit %d fehlenden Übersetzungen",
+             status["images"], status["categories"], status["missingTranslations"])
+
+@app.command("cache-export")
+def _cli_cache_export(path: Path = typer.Argument(CACHE_DIRECTORY / "translation_cache.jsonl.gz",
+                                                  help="Ziel-Datei des Snapshots"),
+                      push: bool = typer.Option(False, "--push", help="Snapshot zusätzlich in den Bucket laden")):
+    """Übersetzungs-Cache als komprimierten, versionierten Snapshot exportieren."""
+    with open(path, "wb") as out:
+        count = cache.export_snapshot(out)
+    log.info("%d Übersetzungen nach %s exportiert (%d Bytes).", count, path, path.stat().st_size)
+    if push:
+        _initialize_services()
+        push_translation_snapshot(path.read_bytes())
+
+@app.command("cache-import")
+def _cli_cache_import(files: List[Path]):
+    """Snapshots in den lokalen Übersetzungs-Cache mergen (jüngerer Eintrag gewinnt)."""
+    for path in files:
+        with open(path, "rb") as src:
+            result = cache.import_snapshot(src)
+        log.info("%s: %d Einträge, %d neu oder aktualisiert.", path.name, result["entries"], result["merged"])
+
+@app.command("cache-pull")
+def _cli_cache_pull(force: bool = typer.Option(False, "--force", help="Auch einen schon importierten Snapshot laden")):
+    """Snapshot aus dem Bucket laden und mit dem lokalen Übersetzungs-Cache zusammenführen."""
+    pull_translation_snapshot(force)
+
+@app.command("rebuild-tag-fields")
+def _cli_rebuild_tag_fields():
+    """Tag-Felder tags_<sprache> für den bestehenden Katalog (neu) aufbauen."""
+    rebuild_tag_fields()
+
+@app.command("rerender")
+def _cli_rerender(dry_run: bool = typer.Option(False, "--dry-run", help="Nur zählen, was sich ändern würde"),
+                  limit: int = typer.Option(0, help="Höchstens so viele Bilder prüfen (0 = alle)"),
+                  reset: bool = typer.Option(False, "--reset", help="Gespeicherten Cursor verwerfen"),
+                  retry_failed: bool = typer.Option(False, "--retry-failed",
+                                                    help="Nur die zuvor fehlgeschlagenen Bilder erneut rendern")):
+    """Katalog aus den gespeicherten SVGs neu rendern (A4, Thumbnails) – ohne Gemini, fortsetzbar."""
+    counts = rerender_catalog(dry_run=dry_run, limit=limit or None, reset=reset, retry_failed=retry_failed)
+    log.info("Rerender-Statistik: %s", counts)
+
+@app.command("bench-logging")
+def _cli_bench_logging(workers: int = typer.Option(16, help="Parallele Log-Threads"),
+                       events: int = typer.Option(5000, help="Events pro Thread")):
+    """Log-Durchsatz und Aufruf-Latenz: direkte Handler gegen QueueHandler/QueueListener."""
+    benchmark_logging(workers, events)
+
+@app.command("check-thumb-engine")
+def _cli_check_thumb_engine(files: List[Path],
+                            max_diff: float = typer.Option(THUMB_ENGINE_MAX_DIFF, help="Höchste mittlere Abweichung")):
+    """Bitmap-Thumbnails gegen Inkscape-Renders prüfen (Pixel-Diff); Exit-Code 1, wenn eine Vorlage abweicht."""
+    check_inkscape()
+    failed = 0
+    for png_path in files:
+        result = compare_thumbnail_engines(png_path)
+        ok = result["valid"] and result["meanDiff"] <= max_diff
+        failed += not ok
+        log.info("%s %s: mittlere Abweichung %.2f, %.2f%% Pixel > 64", "OK " if ok else "ABW",
+                 png_path.name, result["meanDiff"], result["pixelsOver64"] * 100)
+    if failed:
+        log.error("%d von %d Vorlagen weichen ab – THUMB_ENGINE=bitmap nicht freigeben.", failed, len(files))
+        raise typer.Exit(1)
+
+@app.command("bench-tag-search")
+def _cli_bench_tag_search(tag: str, lang: str = typer.Option("de", help="Sprachcode der Suche"),
+                          runs: int = typer.Option(5, help="Wiederholungen pro Variante")):
+    """Payload und Latenz der Tag-Suche messen: tags, tags + Feldmaske, tags_<sprache> + Feldmaske."""
+    benchmark_tag_search(tag, lang, runs)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    app()
\ No newline at end of file